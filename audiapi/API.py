@@ -1,13 +1,23 @@
+import functools
 import json
+import threading
+import time
+from contextlib import contextmanager
 
-import requests
-
+from audiapi.Cache import ResponseCache
+from audiapi.Conditional import ConditionalRequests
+from audiapi.Exceptions import AuthError, InvalidResponseError, TransportError, error_for
+from audiapi.Instrumentation import Instrumentation, RequestMetrics
+from audiapi.JsonBackend import get_backend
+from audiapi.RateLimit import RateLimiter
+from audiapi.Retry import RetryPolicy
 from audiapi.Token import Token
 
 
-class API:
+class BaseAPI:
     """
-    Wrapper for the audi API
+    Transport independent part of the audi API wrapper.
+    Holds the auth state and turns replies into model objects
     """
     BASE_URL = 'https://msg.audi.de/fs-car'
     BASE_CAR_URL = 'https://msg.audi.de/fs-car/bs/cf/v1/Audi/DE/vehicles'
@@ -24,18 +34,36 @@ class API:
                     'ADRUM_1': 'isModule:true',
                     'ADRUM': 'isAray:true'}
 
-    def __init__(self, proxy=None):
+    def __init__(self, json_backend=None, cache: ResponseCache = None, conditional: ConditionalRequests = None,
+                 rate_limiter: RateLimiter = None, retry: RetryPolicy = None,
+                 instrumentation: Instrumentation = None):
         """
-        Creates a new API
-
-        :param proxy: Proxy which should be used in the URL format e.g. http://proxy:8080
+        :param json_backend: JsonBackend used to decode replies, defaults to the fastest one installed
+        :param cache: Cache for replies of read-only requests or None to disable caching
+        :param conditional: Sends conditional requests for polled URLs or None to always fetch the full reply
+        :param rate_limiter: Limits the request rate per service path or None for no limit
+        :param retry: Retries failed GET requests and fails fast for failing service paths or None for single attempts
+        :param instrumentation: Receives the metrics of every request or None to measure nothing
         """
         self.__token = None
-        if proxy is not None:
-            self.__proxy = {'http': proxy,
-                            'https': proxy}
-        else:
-            self.__proxy = None
+        self.__token_manager = None
+        self.__json = json_backend
+        self._cache = cache
+        self._conditional = conditional
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._instrumentation = instrumentation
+
+    @property
+    def _json(self):
+        """
+        JSON backend, the installed ones are only probed once the first reply is decoded
+
+        :rtype: audiapi.JsonBackend.JsonBackend
+        """
+        if self.__json is None:
+            self.__json = get_backend()
+        return self.__json
 
     def use_token(self, token: Token):
         """
@@ -45,34 +73,474 @@ class API:
         """
         self.__token = token
 
-    def get(self, url):
-        r = requests.get(url, headers=self.__get_headers(), proxies=self.__proxy)
-        return self.__handle_error(r.json())
+    def use_token_manager(self, token_manager):
+        """
+        Takes the token for each request from the given manager, which renews it when required
+
+        :param token_manager: TokenManager or None to use the token set by use_token
+        :type token_manager: audiapi.TokenManager.TokenManager
+        """
+        self.__token_manager = token_manager
+
+    def _current_token(self):
+        if self.__token_manager is not None:
+            return self.__token_manager.token()
+        return self.__token
+
+    def _process(self, content, parser=None, status: int = 200, headers=None, service_path: str = None,
+                 vin: str = None, metrics: RequestMetrics = None):
+        """
+        Decodes the reply, checks it for errors and converts it using the given parser
+
+        :param content: Raw JSON reply
+        :param parser: Callable which converts the reply into a model object or None to return the raw data
+        :param status: HTTP status of the reply
+        :param headers: Headers of the reply
+        :param service_path: Service path of the request
+        :param vin: VIN of the vehicle the request was sent for
+        :param metrics: Metrics which receive the decode and parse times
+        :return: Parsed reply, None if a successful reply has no body (e.g. 204 of an action)
+        :raises AudiAPIError: If the backend reported an error or the reply is no valid JSON
+        """
+        if 200 <= status < 300 and not content.strip():
+            return None
+        start = time.perf_counter()
+        if parser is not None and status < 400:
+            model = self._json.decode_model(content, parser)
+            if model is not None:
+                if metrics is not None:
+                    metrics.decode = time.perf_counter() - start
+                return model
+        try:
+            data = self._json.loads(content)
+        except self._json.decode_errors:
+            if status >= 400:
+                raise error_for(status, service_path=service_path, vin=vin,
+                                retry_after=self.__retry_after(headers)) from None
+            raise InvalidResponseError('Invalid reply: ' + repr(content[:100]), status=status,
+                                       service_path=service_path, vin=vin) from None
+        if metrics is not None:
+            metrics.decode = time.perf_counter() - start
+        data = self._handle_error(data, status, headers, service_path, vin)
+        if parser is None:
+            return data
+        start = time.perf_counter()
+        result = parser(data)
+        if metrics is not None:
+            metrics.parse = time.perf_counter() - start
+        return result
+
+    @contextmanager
+    def _measure(self, method: str, service_path: str, operation: str):
+        """
+        Measures a request and hands the metrics to the instrumentation once it is done
+
+        :return: Context manager which provides the RequestMetrics or None without instrumentation
+        """
+        if self._instrumentation is None:
+            yield None
+            return
+        metrics = RequestMetrics(method, service_path, operation)
+        start = time.perf_counter()
+        try:
+            yield metrics
+        except Exception as e:
+            metrics.error = type(e).__name__
+            raise
+        finally:
+            metrics.total = time.perf_counter() - start
+            self._instrumentation.record(metrics)
+
+    def _rate_limit_delay(self, service_path: str):
+        """
+        Takes a token from the rate limiter
+
+        :return: Seconds to wait before sending the request
+        :rtype: float
+        """
+        if self._rate_limiter is None:
+            return 0.0
+        return self._rate_limiter.reserve(service_path)
+
+    def _rate_limit_feedback(self, service_path: str, status: int, headers, sent_at: float = None):
+        """
+        Lets an adaptive rate limiter react to the reply
+
+        :param sent_at: Time the request was sent (time.monotonic)
+        """
+        if self._rate_limiter is not None:
+            self._rate_limiter.feedback(service_path, status, headers.get('Retry-After'), sent_at)
+
+    def _check_circuit(self, service_path: str):
+        """
+        Called before every attempt
+
+        :return: True if the attempt is the trial request of a half-open circuit
+        :rtype: bool
+        :raises CircuitOpenError: If the service path currently fails
+        """
+        if self._retry is None:
+            return False
+        return self._retry.check(service_path)
+
+    def _abort_trial(self, service_path: str):
+        """
+        Called if a trial attempt ended without a reply or transport error, e.g. because it was cancelled
+        """
+        if self._retry is not None:
+            self._retry.abort_trial(service_path)
+
+    def _retry_delay(self, service_path: str, attempt: int, status: int = None, idempotent: bool = True,
+                     headers=None):
+        """
+        Records the outcome of an attempt
+
+        :param status: HTTP status or None if the request failed on the transport level
+        :param headers: Headers of the reply, their Retry-After is respected
+        :return: Seconds to wait before the next attempt or None if the request is done
+        """
+        if self._retry is None:
+            return None
+        retry_after = 0.0
+        if status in RetryPolicy.RETRY_AFTER_STATUSES:
+            retry_after = self.__retry_after(headers)
+        return self._retry.on_reply(service_path, attempt, status, idempotent, retry_after)
+
+    def _access_token(self):
+        """
+        :return: Access token requests are sent with or None
+        :rtype: str
+        """
+        token = self._current_token()
+        if token is None:
+            return None
+        return token.access_token
+
+    def _token_rejected(self, access_token: str):
+        """
+        Called if the backend rejected the access token of a request (AuthError).
+        Lets the token manager log in again
+
+        :param access_token: Access token the request was sent with
+        :return: True if the request should be sent once more with a new token
+        :rtype: bool
+        """
+        if self.__token_manager is None or access_token is None:
+            return False
+        return self.__token_manager.invalidate(access_token)
 
-    def put(self, url, data=None, headers=None):
-        full_headers = self.__get_headers()
-        full_headers.update(headers)
-        r = requests.put(url, data, headers=full_headers, proxies=self.__proxy)
-        return self.__handle_error(r.json())
+    def _cache_key(self, url: str, parser):
+        token = self._access_token()
+        if isinstance(parser, functools.partial):
+            # Partials are compared by identity, equal ones created per call would never match
+            try:
+                key = (parser.func, parser.args, frozenset(parser.keywords.items()))
+                hash(key)
+                parser = key
+            except TypeError:
+                # Unhashable arguments, the partial itself is the key
+                pass
+        return url, token, parser
 
-    def post(self, url, data=None, use_json: bool = True):
+    def _cache_get(self, url: str, parser, service_path: str):
+        """
+        :return: Cached reply or ResponseCache.MISS. Services which aren't cached skip the lookup,
+        so they don't count as misses
+        """
+        if self._cache is None or self._cache.ttl(service_path) <= 0:
+            return ResponseCache.MISS
+        return self._cache.get(self._cache_key(url, parser))
+
+    def _cache_put(self, url: str, parser, service_path: str, result):
+        if self._cache is not None and self._cache.ttl(service_path) > 0:
+            self._cache.put(self._cache_key(url, parser), service_path, result)
+
+    def _cache_invalidate(self, service_path: str):
+        """
+        Called after write requests since they might change what the service returns
+        """
+        if self._cache is not None:
+            self._cache.invalidate(service_path)
+
+    def _conditional_headers(self, url: str, parser, service_path: str):
+        """
+        :return: Validator headers for the request or None
+        """
+        if self._conditional is None or not self._conditional.applies(service_path):
+            return None
+        return self._conditional.headers(self._cache_key(url, parser))
+
+    def _process_conditional(self, url: str, parser, service_path: str, status: int, headers, content,
+                             vin: str = None, metrics: RequestMetrics = None):
+        """
+        Like _process but reuses the previous result if the reply didn't change
+        """
+        if self._conditional is None or not self._conditional.applies(service_path):
+            return self._process(content, parser, status, headers, service_path, vin, metrics)
+        key = self._cache_key(url, parser)
+        previous = self._conditional.unchanged(key, status, content)
+        if previous is not None:
+            return previous
+        result = self._process(content, parser, status, headers, service_path, vin, metrics)
+        self._conditional.remember(key, headers, content, result)
+        return result
+
+    def _handle_error(self, data, status: int = 200, headers=None, service_path: str = None, vin: str = None):
+        """
+        :return: Data if it isn't an error
+        :raises AudiAPIError: Matching error if the backend reported one
+        """
+        error = None
+        if isinstance(data, dict):
+            error = data.get('error')
+        if error is None and status < 400:
+            return data
+
+        code = error
+        description = None
+        if isinstance(data, dict):
+            description = data.get('error_description')
+        if isinstance(error, dict):
+            # Gateway errors carry the details in a nested object
+            code = error.get('errorCode')
+            description = error.get('description')
+        raise error_for(status, code, description, service_path, vin, self.__retry_after(headers))
+
+    @staticmethod
+    def __retry_after(headers):
+        if headers is None:
+            return 0.0
+        return RateLimiter.parse_retry_after(headers.get('Retry-After'))
+
+    @staticmethod
+    def _encode_data(data, use_json: bool):
         if use_json and data is not None:
-            data = json.dumps(data)
-        r = requests.post(url, data=data, headers=self.__get_headers(), proxies=self.__proxy)
-        return self.__handle_error(r.json())
-
-    def __handle_error(self, data):
-        error = data.get('error')
-        if error is not None:
-            error_msg = data.get('error_description', '')
-            raise Exception('API error: ' + str(error) + '\n' + error_msg)
+            return json.dumps(data)
         return data
 
-    def __get_headers(self):
+    def _get_headers(self, headers=None):
         full_headers = dict()
         full_headers.update(self.BASE_HEADERS)
         token_value = 'AudiAuth 1'
-        if self.__token is not None:
-            token_value += ' ' + self.__token.access_token
+        token = self._current_token()
+        if token is not None:
+            token_value += ' ' + token.access_token
         full_headers['Authorization'] = token_value
+        if headers is not None:
+            full_headers.update(headers)
         return full_headers
+
+
+class API(BaseAPI):
+    """
+    Wrapper for the audi API
+    """
+
+    def __init__(self, proxy=None, pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 3,
+                 backoff_factor: float = 0.5, timeout=None, json_backend=None, cache: ResponseCache = None,
+                 conditional: ConditionalRequests = None, rate_limiter: RateLimiter = None,
+                 session: 'requests.Session' = None, retry: RetryPolicy = None,
+                 instrumentation: Instrumentation = None):
+        """
+        Creates a new API
+
+        All requests are sent through a single pooled session, so connections
+        to the backend are kept alive and reused between calls. The session
+        (and requests itself) is only created once the first request is sent.
+
+        :param proxy: Proxy which should be used in the URL format e.g. http://proxy:8080
+        :param pool_connections: Number of hosts for which connection pools are kept
+        :param pool_maxsize: Maximum number of connections kept alive per host
+        :param max_retries: Number of transport level retries (connection errors only, POSTs are never retried).
+        Ignored if a retry policy is given, it retries connection errors itself
+        :param backoff_factor: Backoff factor between transport level retries
+        :param timeout: Timeout in seconds for each request or None to wait forever
+        :param json_backend: JsonBackend used to decode replies, defaults to the fastest one installed
+        :param cache: Cache for replies of read-only requests or None to disable caching
+        :param conditional: Sends conditional requests for polled URLs or None to always fetch the full reply
+        :param rate_limiter: Limits the request rate per service path or None for no limit
+        :param session: Session to share with other API instances, see create_session. The pool options
+        are ignored then and the session is not closed by this API. Create it with max_retries=0 if a retry
+        policy is given, otherwise every attempt of the policy is retried on the transport level as well
+        :param retry: Retries failed GET requests and fails fast for failing service paths or None for single attempts
+        :param instrumentation: Receives the metrics of every request or None to measure nothing
+        """
+        super().__init__(json_backend, cache, conditional, rate_limiter, retry, instrumentation)
+        if proxy is not None:
+            self.__proxy = {'http': proxy,
+                            'https': proxy}
+        else:
+            self.__proxy = None
+        self.__timeout = timeout
+        self.__owns_session = session is None
+        self.__session = session
+        if retry is not None:
+            # The policy retries connection errors itself, two layers would multiply the attempts
+            max_retries = 0
+        self.__session_options = (pool_connections, pool_maxsize, max_retries, backoff_factor)
+        self.__session_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes all pooled connections
+        """
+        if self.__owns_session and self.__session is not None:
+            self.__session.close()
+
+    def get(self, url, parser=None, service_path: str = None, vin: str = None, operation: str = None):
+        return self.__authenticated(lambda: self.__get(url, parser, service_path, vin, operation))
+
+    def put(self, url, data=None, headers=None, parser=None, service_path: str = None, vin: str = None,
+            operation: str = None):
+        return self.__authenticated(lambda: self.__put(url, data, headers, parser, service_path, vin, operation))
+
+    def post(self, url, data=None, use_json: bool = True, parser=None, service_path: str = None, vin: str = None,
+             operation: str = None):
+        return self.__authenticated(lambda: self.__post(url, data, use_json, parser, service_path, vin, operation))
+
+    def __authenticated(self, request):
+        """
+        Sends a request once more with a new token if the backend rejected the token of the token manager
+
+        :param request: Callable which sends the request
+        :return: Result of the request
+        """
+        access_token = self._access_token()
+        try:
+            return request()
+        except AuthError:
+            if not self._token_rejected(access_token):
+                raise
+        return request()
+
+    def __get(self, url, parser, service_path: str, vin: str, operation: str):
+        cached = self._cache_get(url, parser, service_path)
+        if cached is not ResponseCache.MISS:
+            return cached
+        with self._measure('GET', service_path, operation) as metrics:
+            r = self.__send(service_path, True, lambda: self.__get_session().get(
+                url, headers=self._get_headers(self._conditional_headers(url, parser, service_path)),
+                proxies=self.__proxy, timeout=self.__timeout), vin, metrics)
+            result = self._process_conditional(url, parser, service_path, r.status_code, r.headers, r.content, vin,
+                                               metrics)
+        self._cache_put(url, parser, service_path, result)
+        return result
+
+    def __put(self, url, data, headers, parser, service_path: str, vin: str, operation: str):
+        with self._measure('PUT', service_path, operation) as metrics:
+            try:
+                r = self.__send(service_path, False, lambda: self.__get_session().put(
+                    url, data, headers=self._get_headers(headers), proxies=self.__proxy, timeout=self.__timeout),
+                                vin, metrics)
+            finally:
+                self._cache_invalidate(service_path)
+            return self._process(r.content, parser, r.status_code, r.headers, service_path, vin, metrics)
+
+    def __post(self, url, data, use_json: bool, parser, service_path: str, vin: str, operation: str):
+        with self._measure('POST', service_path, operation) as metrics:
+            try:
+                r = self.__send(service_path, False, lambda: self.__get_session().post(
+                    url, data=self._encode_data(data, use_json), headers=self._get_headers(), proxies=self.__proxy,
+                    timeout=self.__timeout), vin, metrics)
+            finally:
+                self._cache_invalidate(service_path)
+            return self._process(r.content, parser, r.status_code, r.headers, service_path, vin, metrics)
+
+    def __send(self, service_path: str, idempotent: bool, send, vin: str = None, metrics: RequestMetrics = None):
+        """
+        Sends a request, retrying it according to the retry policy
+
+        :param service_path: Service path of the request
+        :param idempotent: True if the request may be sent more than once
+        :param send: Callable which sends the request once
+        :param vin: VIN of the vehicle the request is sent for
+        :param metrics: Metrics of the request or None
+        :return: Response
+        :rtype: requests.Response
+        :raises TransportError: If the last attempt got no reply
+        """
+        attempt = 0
+        while True:
+            trial = self._check_circuit(service_path)
+            recorded = False
+            try:
+                delay = self._rate_limit_delay(service_path)
+                if delay > 0:
+                    time.sleep(delay)
+                if metrics is not None:
+                    metrics.attempts += 1
+                sent_at = time.monotonic()
+                try:
+                    r = send()
+                except _requests().RequestException as e:
+                    recorded = True
+                    delay = self._retry_delay(service_path, attempt, idempotent=idempotent)
+                    if delay is None:
+                        raise TransportError('Transport error: ' + (str(e) or type(e).__name__),
+                                             service_path=service_path, vin=vin) from e
+                else:
+                    if metrics is not None:
+                        # requests neither exposes DNS nor connect times, elapsed ends when the headers are parsed
+                        metrics.status = r.status_code
+                        metrics.ttfb = r.elapsed.total_seconds()
+                        metrics.request_size = len(r.request.body or b'')
+                        metrics.response_size = len(r.content)
+                    self._rate_limit_feedback(service_path, r.status_code, r.headers, sent_at)
+                    recorded = True
+                    delay = self._retry_delay(service_path, attempt, r.status_code, idempotent, r.headers)
+                    if delay is None:
+                        return r
+            finally:
+                if trial and not recorded:
+                    # E.g. the token couldn't be renewed or the thread was interrupted
+                    self._abort_trial(service_path)
+            attempt += 1
+            time.sleep(delay)
+
+    def __get_session(self):
+        """
+        :return: Session, created on first use
+        :rtype: requests.Session
+        """
+        if self.__session is None:
+            with self.__session_lock:
+                if self.__session is None:
+                    self.__session = self.create_session(*self.__session_options)
+        return self.__session
+
+    @staticmethod
+    def create_session(pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 3,
+                       backoff_factor: float = 0.5):
+        """
+        Creates a keep-alive session, which can be shared by several API instances
+
+        :return: Session
+        :rtype: requests.Session
+        """
+        requests = _requests()
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Throttled replies are left to the rate limiter instead of being retried transparently
+        retries = Retry(total=max_retries, backoff_factor=backoff_factor, respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+def _requests():
+    """
+    Imports requests on first use, it is the slowest import by far
+
+    :return: requests module
+    """
+    import requests
+    return requests
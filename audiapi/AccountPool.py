@@ -0,0 +1,205 @@
+import threading
+
+from audiapi.API import API
+from audiapi.RateLimit import RateLimiter
+from audiapi.Services import CarService
+from audiapi.Token import Token
+from audiapi.TokenManager import TokenManager, FileTokenStore
+from audiapi.model.Vehicle import Vehicle
+
+
+class Account:
+    """
+    Single myAudi account of an AccountPool
+    """
+
+    def __init__(self, name: str, api: API):
+        self.name = name
+        self.api = api
+        """
+        API which sends the requests with the token of this account
+
+        :type api: API
+        """
+        self.vehicles = {}
+        """
+        Vehicles of this account by VIN
+
+        :type vehicles: dict[str, Vehicle]
+        """
+
+    def __str__(self):
+        return self.name + ': ' + str(len(self.vehicles)) + ' vehicles'
+
+
+class AccountPool:
+    """
+    Serves many myAudi accounts from one process.
+
+    Every account has its own token and rate limits, but all of them share one
+    connection pool. Requests for a vehicle are sent with the token of its account:
+
+        pool = AccountPool(pool_maxsize=50)
+        pool.add_account('customer-a', user, password, rate_limit=5)
+        pool.discover_all()
+        report = VehicleStatusReportService(pool.api_for(vin), pool.vehicle(vin)).get_stored_vehicle_data()
+
+    The pool can be passed to a Fleet instead of an API to route each vehicle to its account.
+    """
+
+    def __init__(self, proxy=None, pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 3,
+                 backoff_factor: float = 0.5, timeout=None, json_backend=None):
+        """
+        :param proxy: Proxy which should be used in the URL format e.g. http://proxy:8080
+        :param pool_connections: Number of hosts for which connection pools are kept
+        :param pool_maxsize: Maximum number of connections kept alive per host, shared by all accounts
+        :param max_retries: Number of transport level retries (connection errors only, POSTs are never retried).
+        Use 0 if the accounts get a RetryPolicy, otherwise every attempt of the policy is retried as well
+        :param backoff_factor: Backoff factor between transport level retries
+        :param timeout: Timeout in seconds for each request or None to wait forever
+        :param json_backend: JsonBackend used to decode replies, defaults to the fastest one installed
+        """
+        self.__proxy = proxy
+        self.__timeout = timeout
+        self.__json_backend = json_backend
+        self.__session = API.create_session(pool_connections, pool_maxsize, max_retries, backoff_factor)
+        self.__accounts = {}
+        self.__vins = {}
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes the shared connection pool
+        """
+        self.__session.close()
+
+    def add_account(self, name: str, user: str = None, password: str = None, token: Token = None,
+                    store: FileTokenStore = None, rate_limit: float = None, burst: int = 1, rates: dict = None,
+                    **api_options):
+        """
+        Adds an account. Either the credentials or a token have to be given
+
+        :param name: Unique name of the account
+        :param user: User, the token is then renewed automatically by a TokenManager
+        :param password: Password
+        :param token: Token to use instead of logging in
+        :param store: Token store shared with other processes, see TokenManager
+        :param rate_limit: Maximum number of requests per second for this account or None for no limit
+        :param burst: Number of requests which may exceed the rate limits at once
+        :param rates: Maximum number of requests per second of this account by service path
+        :param api_options: Further options of the API (e.g. cache)
+        :return: Added account
+        :rtype: Account
+        """
+        rate_limiter = None
+        if rate_limit is not None or rates is not None:
+            rate_limiter = RateLimiter(rate_limit, burst, rates)
+        api = API(proxy=self.__proxy, timeout=self.__timeout, json_backend=self.__json_backend,
+                  rate_limiter=rate_limiter, session=self.__session, **api_options)
+        if user is not None:
+            api.use_token_manager(TokenManager(api, user, password, store=store))
+        elif token is not None:
+            api.use_token(token)
+        else:
+            raise ValueError('Account ' + name + ' requires credentials or a token')
+
+        account = Account(name, api)
+        with self.__lock:
+            if name in self.__accounts:
+                raise ValueError('Account ' + name + ' already exists')
+            self.__accounts[name] = account
+        return account
+
+    def account(self, name: str):
+        """
+        :param name: Name of the account
+        :rtype: Account
+        """
+        return self.__accounts[name]
+
+    @property
+    def accounts(self):
+        """
+        :rtype: list[Account]
+        """
+        return list(self.__accounts.values())
+
+    def register(self, vehicle, name: str):
+        """
+        Assigns a vehicle to an account
+
+        :param vehicle: Vehicle or VIN
+        :param name: Name of the account
+        """
+        if isinstance(vehicle, str):
+            vin = vehicle
+            vehicle = Vehicle()
+            vehicle.vin = vin
+        account = self.__accounts[name]
+        with self.__lock:
+            previous = self.__vins.get(vehicle.vin)
+            if previous is not None:
+                previous.vehicles.pop(vehicle.vin, None)
+            account.vehicles[vehicle.vin] = vehicle
+            self.__vins[vehicle.vin] = account
+
+    def discover(self, name: str):
+        """
+        Registers all vehicles of the account
+
+        :param name: Name of the account
+        :return: Vehicles of the account
+        :rtype: VehiclesResponse
+        """
+        vehicles = CarService(self.__accounts[name].api).get_vehicles()
+        for vehicle in vehicles.vehicles:
+            self.register(vehicle, name)
+        return vehicles
+
+    def discover_all(self):
+        """
+        Registers the vehicles of all accounts
+        """
+        for account in self.accounts:
+            self.discover(account.name)
+
+    def account_for(self, vin: str):
+        """
+        :param vin: VIN
+        :return: Account which owns the vehicle
+        :rtype: Account
+        """
+        account = self.__vins.get(vin)
+        if account is None:
+            raise KeyError('No account for vehicle ' + vin)
+        return account
+
+    def api_for(self, vin: str):
+        """
+        :param vin: VIN
+        :return: API which uses the token of the account owning the vehicle
+        :rtype: API
+        """
+        return self.account_for(vin).api
+
+    def vehicle(self, vin: str):
+        """
+        :param vin: VIN
+        :return: Registered vehicle
+        :rtype: Vehicle
+        """
+        return self.account_for(vin).vehicles[vin]
+
+    @property
+    def vehicles(self):
+        """
+        :return: All registered vehicles
+        :rtype: list[Vehicle]
+        """
+        return [account.vehicles[vin] for vin, account in list(self.__vins.items())]
@@ -0,0 +1,208 @@
+import asyncio
+import time
+
+import aiohttp
+
+from audiapi.API import BaseAPI
+from audiapi.Cache import ResponseCache
+from audiapi.Conditional import ConditionalRequests
+from audiapi.Exceptions import AuthError, TransportError
+from audiapi.Instrumentation import Instrumentation, RequestMetrics
+from audiapi.RateLimit import RateLimiter
+from audiapi.Retry import RetryPolicy
+
+
+class AsyncAPI(BaseAPI):
+    """
+    asyncio variant of the audi API.
+
+    Takes the same arguments as the API on get/put/post and raises the same errors.
+    All services can be used with it - their request methods then return awaitables:
+
+        async with AsyncAPI() as api:
+            data = await VehicleStatusReportService(api, vehicle).get_stored_vehicle_data()
+    """
+
+    def __init__(self, proxy=None, pool_maxsize: int = 100, pool_maxsize_per_host: int = 0, timeout=None,
+                 json_backend=None, cache: ResponseCache = None, conditional: ConditionalRequests = None,
+                 rate_limiter: RateLimiter = None, retry: RetryPolicy = None,
+                 instrumentation: Instrumentation = None):
+        """
+        Creates a new async API
+
+        :param proxy: Proxy which should be used in the URL format e.g. http://proxy:8080
+        :param pool_maxsize: Maximum number of open connections, 0 for no limit
+        :param pool_maxsize_per_host: Maximum number of open connections per host, 0 for no limit
+        :param timeout: Timeout in seconds for each request or None to wait forever
+        :param json_backend: JsonBackend used to decode replies, defaults to the fastest one installed
+        :param cache: Cache for replies of read-only requests or None to disable caching
+        :param conditional: Sends conditional requests for polled URLs or None to always fetch the full reply
+        :param rate_limiter: Limits the request rate per service path or None for no limit
+        :param retry: Retries failed GET requests and fails fast for failing service paths or None for single attempts
+        :param instrumentation: Receives the metrics of every request or None to measure nothing
+        """
+        super().__init__(json_backend, cache, conditional, rate_limiter, retry, instrumentation)
+        self.__proxy = proxy
+        self.__pool_maxsize = pool_maxsize
+        self.__pool_maxsize_per_host = pool_maxsize_per_host
+        self.__timeout = timeout
+        self.__session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes all pooled connections
+        """
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def get(self, url, parser=None, service_path: str = None, vin: str = None, operation: str = None):
+        cached = self._cache_get(url, parser, service_path)
+        if cached is not ResponseCache.MISS:
+            return cached
+        result = await self.__request('GET', url, None, None, parser, service_path, vin, operation)
+        self._cache_put(url, parser, service_path, result)
+        return result
+
+    async def put(self, url, data=None, headers=None, parser=None, service_path: str = None, vin: str = None,
+                  operation: str = None):
+        try:
+            return await self.__request('PUT', url, data, headers, parser, service_path, vin, operation)
+        finally:
+            self._cache_invalidate(service_path)
+
+    async def post(self, url, data=None, use_json: bool = True, parser=None, service_path: str = None,
+                   vin: str = None, operation: str = None):
+        try:
+            return await self.__request('POST', url, self._encode_data(data, use_json), None, parser,
+                                        service_path, vin, operation)
+        finally:
+            self._cache_invalidate(service_path)
+
+    async def __request(self, method: str, url: str, data, headers, parser, service_path: str = None,
+                        vin: str = None, operation: str = None):
+        """
+        Sends a request, retrying GET requests according to the retry policy.
+        If the backend rejects the token of the token manager, it is sent once more with a new token
+
+        :param headers: Additional headers
+        """
+        access_token = self._access_token()
+        try:
+            with self._measure(method, service_path, operation) as metrics:
+                return await self.__send(method, url, data, headers, parser, service_path, vin, metrics)
+        except AuthError:
+            if not self._token_rejected(access_token):
+                raise
+        with self._measure(method, service_path, operation) as metrics:
+            return await self.__send(method, url, data, headers, parser, service_path, vin, metrics)
+
+    async def __send(self, method: str, url: str, data, headers, parser, service_path: str, vin: str,
+                     metrics: RequestMetrics):
+        attempt = 0
+        while True:
+            trial = self._check_circuit(service_path)
+            recorded = False
+            try:
+                delay = self._rate_limit_delay(service_path)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if method == 'GET':
+                    headers = self._conditional_headers(url, parser, service_path)
+                if metrics is not None:
+                    metrics.attempts += 1
+                sent_at = time.monotonic()
+                try:
+                    async with self.__get_session().request(method, url, data=data,
+                                                            headers=self._get_headers(headers), proxy=self.__proxy,
+                                                            trace_request_ctx=metrics) as r:
+                        reply = await r.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    recorded = True
+                    delay = self._retry_delay(service_path, attempt, idempotent=method == 'GET')
+                    if delay is None:
+                        raise TransportError('Transport error: ' + (str(e) or type(e).__name__),
+                                             service_path=service_path, vin=vin) from e
+                else:
+                    if metrics is not None:
+                        metrics.status = r.status
+                        metrics.request_size = len(data) if isinstance(data, (str, bytes)) else 0
+                        metrics.response_size = len(reply)
+                    self._rate_limit_feedback(service_path, r.status, r.headers, sent_at)
+                    recorded = True
+                    delay = self._retry_delay(service_path, attempt, r.status, method == 'GET', r.headers)
+                    if delay is None:
+                        break
+            finally:
+                if trial and not recorded:
+                    # E.g. the request was cancelled or the token couldn't be renewed
+                    self._abort_trial(service_path)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+        if method == 'GET':
+            return self._process_conditional(url, parser, service_path, r.status, r.headers, reply, vin, metrics)
+        return self._process(reply, parser, r.status, r.headers, service_path, vin, metrics)
+
+    def __get_session(self):
+        """
+        Returns the pooled session. It is created on first use since
+        aiohttp requires a running event loop for it
+
+        :return: Session
+        :rtype: aiohttp.ClientSession
+        """
+        if self.__session is None:
+            connector = aiohttp.TCPConnector(limit=self.__pool_maxsize, limit_per_host=self.__pool_maxsize_per_host)
+            trace_configs = None
+            if self._instrumentation is not None:
+                trace_configs = [self.__trace_config()]
+            self.__session = aiohttp.ClientSession(connector=connector,
+                                                   timeout=aiohttp.ClientTimeout(total=self.__timeout),
+                                                   trace_configs=trace_configs)
+        return self.__session
+
+    @staticmethod
+    def __trace_config():
+        """
+        Creates the trace config which fills the connection timings into the metrics
+        passed as trace_request_ctx
+
+        :rtype: aiohttp.TraceConfig
+        """
+
+        async def request_start(session, context, params):
+            context.start = time.perf_counter()
+
+        async def dns_start(session, context, params):
+            context.dns_start = time.perf_counter()
+
+        async def dns_end(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.dns = time.perf_counter() - context.dns_start
+
+        async def connect_start(session, context, params):
+            context.connect_start = time.perf_counter()
+
+        async def connect_end(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.connect = time.perf_counter() - context.connect_start
+
+        async def request_end(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.ttfb = time.perf_counter() - context.start
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(request_start)
+        config.on_dns_resolvehost_start.append(dns_start)
+        config.on_dns_resolvehost_end.append(dns_end)
+        config.on_connection_create_start.append(connect_start)
+        config.on_connection_create_end.append(connect_end)
+        config.on_request_end.append(request_end)
+        return config
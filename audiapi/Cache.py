@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheStats:
+    """
+    Hit and miss counters of a ResponseCache
+    """
+
+    def __init__(self, hits: int, misses: int, evictions: int, size: int):
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.size = size
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
+class ResponseCache:
+    """
+    LRU cache for parsed replies of read-only requests.
+
+    Entries are keyed by URL, access token and parser and expire after the TTL of
+    their service path. Services without TTL are not cached.
+    Write requests (POST/PUT) invalidate all entries of their service path
+    """
+
+    MISS = object()
+    """
+    Returned by get() if there is no valid entry
+    """
+
+    DEFAULT_TTLS = {'rolesrights/operationlist/v2': 3600,
+                    'vehicleMgmt/vehicledata/v2': 3600,
+                    'core/auth/v1': 600,
+                    'myaudi/carservice/v2': 600,
+                    'bs/rlu/v1': 300}
+    """
+    TTL in seconds by service path for data which rarely changes
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 0, max_entries: int = 1024):
+        """
+        :param ttls: TTL in seconds by service path (see Service._get_path), defaults to DEFAULT_TTLS
+        :param default_ttl: TTL of services which are not listed, 0 to not cache them
+        :param max_entries: Maximum number of entries, the least recently used one is dropped first
+        """
+        if ttls is None:
+            ttls = self.DEFAULT_TTLS
+        self.__ttls = dict(ttls)
+        self.__default_ttl = default_ttl
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def ttl(self, service_path: str):
+        """
+        Returns the TTL of the given service path
+
+        :return: TTL in seconds, 0 if replies of this service aren't cached
+        :rtype: float
+        """
+        return self.__ttls.get(service_path, self.__default_ttl)
+
+    def get(self, key):
+        """
+        Returns the cached value of the given key
+
+        :return: Value or ResponseCache.MISS
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.__entries[key]
+                self.__misses += 1
+                return self.MISS
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return entry[2]
+
+    def put(self, key, service_path: str, value):
+        """
+        Stores the value if the service path is cached
+        """
+        ttl = self.ttl(service_path)
+        if ttl <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + ttl, service_path, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def invalidate(self, service_path: str = None):
+        """
+        Drops cached entries
+
+        :param service_path: Only drop entries of this service path, None to drop all
+        """
+        with self.__lock:
+            if service_path is None:
+                self.__entries.clear()
+                return
+            for key in [key for key, entry in self.__entries.items() if entry[1] == service_path]:
+                del self.__entries[key]
+
+    def stats(self):
+        """
+        :rtype: CacheStats
+        """
+        with self.__lock:
+            return CacheStats(self.__hits, self.__misses, self.__evictions, len(self.__entries))
@@ -0,0 +1,141 @@
+import threading
+import weakref
+
+from audiapi.model.VehicleDataResponse import VehicleDataResponse
+
+
+class FieldChange:
+    """
+    Change of a single field between two snapshots
+    """
+    __slots__ = ('field_id', 'name', 'old_value', 'new_value', 'measure_time')
+
+    def __init__(self, field_id: str, name: str, old_value, new_value, measure_time):
+        self.field_id = field_id
+        self.name = name
+        self.old_value = old_value
+        """
+        Previous value, None for added fields
+        """
+        self.new_value = new_value
+        """
+        Current value, None for removed fields
+        """
+        self.measure_time = measure_time
+
+    def __str__(self):
+        return str(self.name) + ': ' + str(self.old_value) + ' -> ' + str(self.new_value)
+
+
+class VehicleDataDelta:
+    """
+    Difference between two vehicle data snapshots, keyed by field ID
+    """
+
+    def __init__(self, vin: str, added: dict = None, changed: dict = None, removed: dict = None):
+        self.vin = vin
+        self.added = added if added is not None else {}
+        """
+        :type added: dict[str, FieldChange]
+        """
+        self.changed = changed if changed is not None else {}
+        """
+        :type changed: dict[str, FieldChange]
+        """
+        self.removed = removed if removed is not None else {}
+        """
+        :type removed: dict[str, FieldChange]
+        """
+
+    def all(self):
+        """
+        :return: All changes
+        :rtype: list[FieldChange]
+        """
+        return list(self.added.values()) + list(self.changed.values()) + list(self.removed.values())
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __str__(self):
+        return self.vin + ': ' + ', '.join(str(change) for change in self.all())
+
+
+class ChangeTracker:
+    """
+    Keeps the last snapshot of every vehicle and reports what changed with each new one
+    """
+
+    def __init__(self, fields=None):
+        """
+        :param fields: Names or IDs of the fields which should be tracked, None to track all fields
+        """
+        self.__fields = list(fields) if fields is not None else None
+        self.__snapshots = {}
+        self.__last_responses = {}
+        self.__lock = threading.Lock()
+
+    def update(self, vin: str, response: VehicleDataResponse):
+        """
+        Stores the new snapshot of the vehicle and returns the changes to the previous one.
+        For the first snapshot of a vehicle all fields are reported as added
+
+        :param vin: VIN of the vehicle
+        :param response: New snapshot
+        :return: Delta
+        :rtype: VehicleDataDelta
+        """
+        last_response = self.__last_responses.get(vin)
+        if last_response is not None and last_response() is response:
+            # Same parsed reply again, e.g. from a conditional request
+            return VehicleDataDelta(vin)
+
+        current = self.__extract(response)
+        with self.__lock:
+            previous = self.__snapshots.get(vin, {})
+            self.__snapshots[vin] = current
+            self.__last_responses[vin] = weakref.ref(response)
+
+        delta = VehicleDataDelta(vin)
+        for field_id, (name, value, measure_time) in current.items():
+            old = previous.get(field_id)
+            if old is None:
+                delta.added[field_id] = FieldChange(field_id, name, None, value, measure_time)
+            elif old[1] != value:
+                delta.changed[field_id] = FieldChange(field_id, name, old[1], value, measure_time)
+        for field_id, (name, value, measure_time) in previous.items():
+            if field_id not in current:
+                delta.removed[field_id] = FieldChange(field_id, name, value, None, measure_time)
+        return delta
+
+    def snapshot(self, vin: str):
+        """
+        Returns the last known snapshot of the vehicle
+
+        :return: (name, value, measure time) by field ID
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict(self.__snapshots.get(vin, {}))
+
+    def forget(self, vin: str):
+        """
+        Drops the snapshot of the vehicle
+        """
+        with self.__lock:
+            self.__snapshots.pop(vin, None)
+            self.__last_responses.pop(vin, None)
+
+    def __extract(self, response: VehicleDataResponse):
+        if self.__fields is None:
+            fields = response.data_fields
+        else:
+            fields = [response.get(key) for key in self.__fields]
+        snapshot = {}
+        for field in fields:
+            if field is not None and field.id not in snapshot:
+                snapshot[field.id] = (field.name, field.value, field.measure_time)
+        return snapshot
@@ -0,0 +1,177 @@
+import threading
+
+from audiapi.API import BaseAPI
+from audiapi.Services import CarService, VehicleStatusReportService, RemoteBatteryChargeService, \
+    PreTripClimaService, RemoteTripStatisticsService, RemoteHonkFlashService, CarFinderService, LockUnlockService, \
+    OperationListService, VehicleManagementService
+from audiapi.model.Vehicle import Vehicle, VehiclesResponse
+
+
+class VehicleClient:
+    """
+    Services of a single vehicle.
+
+    Services are created on first access and reused afterwards, so their URL templates
+    are only built once per vehicle:
+
+        car = client.vehicle(vin)
+        car.status.get_stored_vehicle_data()
+        car.battery.get_status()
+    """
+
+    def __init__(self, api: BaseAPI, vehicle: Vehicle):
+        """
+        :param api: API used by all services
+        :param vehicle: Vehicle
+        """
+        self._api = api
+        self.vehicle = vehicle
+        self.__services = {}
+
+    @property
+    def vin(self):
+        return self.vehicle.vin
+
+    @property
+    def status(self):
+        """
+        :rtype: VehicleStatusReportService
+        """
+        return self.service(VehicleStatusReportService)
+
+    @property
+    def battery(self):
+        """
+        :rtype: RemoteBatteryChargeService
+        """
+        return self.service(RemoteBatteryChargeService)
+
+    @property
+    def clima(self):
+        """
+        :rtype: PreTripClimaService
+        """
+        return self.service(PreTripClimaService)
+
+    @property
+    def trips(self):
+        """
+        :rtype: RemoteTripStatisticsService
+        """
+        return self.service(RemoteTripStatisticsService)
+
+    @property
+    def honk_flash(self):
+        """
+        :rtype: RemoteHonkFlashService
+        """
+        return self.service(RemoteHonkFlashService)
+
+    @property
+    def car_finder(self):
+        """
+        :rtype: CarFinderService
+        """
+        return self.service(CarFinderService)
+
+    @property
+    def lock(self):
+        """
+        :rtype: LockUnlockService
+        """
+        return self.service(LockUnlockService)
+
+    @property
+    def operations(self):
+        """
+        :rtype: OperationListService
+        """
+        return self.service(OperationListService)
+
+    @property
+    def management(self):
+        """
+        :rtype: VehicleManagementService
+        """
+        return self.service(VehicleManagementService)
+
+    def service(self, service_class):
+        """
+        Returns the instance of a vehicle service for this vehicle, created on first use
+
+        :param service_class: Subclass of VehicleService
+        :return: Service
+        """
+        service = self.__services.get(service_class)
+        if service is None:
+            # Creating a service twice in a race is harmless, the first one stored wins
+            service = self.__services.setdefault(service_class, service_class(self._api, self.vehicle))
+        return service
+
+    def __str__(self):
+        return 'VehicleClient for ' + str(self.vin)
+
+
+class Client:
+    """
+    Entry point which hands out one VehicleClient per vehicle
+
+        client = Client(api)
+        for car in client.vehicles():
+            print(car.vin, car.status.get_stored_vehicle_data().total_range_km)
+    """
+
+    def __init__(self, api: BaseAPI):
+        """
+        :param api: API used by all services
+        """
+        self._api = api
+        self.__vehicles = {}
+        self.__lock = threading.Lock()
+        self.__cars = None
+
+    @property
+    def cars(self):
+        """
+        :rtype: CarService
+        """
+        if self.__cars is None:
+            self.__cars = CarService(self._api)
+        return self.__cars
+
+    def vehicle(self, vehicle):
+        """
+        Returns the client of a vehicle, the same one for every call with the same VIN
+
+        :param vehicle: Vehicle or VIN
+        :rtype: VehicleClient
+        """
+        vin = vehicle
+        if isinstance(vehicle, Vehicle):
+            vin = vehicle.vin
+        client = self.__vehicles.get(vin)
+        if client is not None:
+            return client
+        with self.__lock:
+            client = self.__vehicles.get(vin)
+            if client is None:
+                if not isinstance(vehicle, Vehicle):
+                    vehicle = Vehicle()
+                    vehicle.vin = vin
+                client = VehicleClient(self._api, vehicle)
+                self.__vehicles[vin] = client
+            return client
+
+    def vehicles(self, vehicles=None):
+        """
+        Returns the clients of the given vehicles or of all vehicles of the account.
+        Only works with the blocking API if the vehicles are fetched
+
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs, None to fetch the vehicle list
+        :rtype: list[VehicleClient]
+        """
+        if vehicles is None:
+            vehicles = self.cars.get_vehicles()
+        if isinstance(vehicles, VehiclesResponse):
+            vehicles = vehicles.vehicles
+        return [self.vehicle(vehicle) for vehicle in vehicles]
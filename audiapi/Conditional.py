@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+from datetime import timezone
+
+
+class ConditionalRequests:
+    """
+    Turns repeated GET requests into conditional requests.
+
+    The validators of the last reply (ETag / Last-Modified) are sent with the next request
+    of the same URL. If the server gives none, the time the car sent the newest field
+    (see VehicleDataResponse.newest_send_time) is used as Last-Modified.
+    If the server answers with 304 or the body didn't change, the previously parsed
+    reply is returned without parsing it again
+    """
+
+    NOT_MODIFIED = 304
+
+    DEFAULT_SERVICE_PATHS = {'bs/vsr/v1'}
+
+    def __init__(self, service_paths=None, max_entries: int = 10000):
+        """
+        :param service_paths: Service paths for which conditional requests are sent, defaults to
+        the vehicle status report
+        :param max_entries: Maximum number of tracked URLs, the least recently used one is dropped first
+        """
+        if service_paths is None:
+            service_paths = self.DEFAULT_SERVICE_PATHS
+        self.__service_paths = set(service_paths)
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.not_modified = 0
+        """
+        Number of replies which have been reused
+        """
+
+    def applies(self, service_path: str):
+        return service_path in self.__service_paths
+
+    def headers(self, key):
+        """
+        Returns the conditional headers for the next request
+
+        :param key: Request key (URL, token and parser)
+        :return: Headers or None if nothing is known about the URL yet
+        :rtype: dict
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        etag, last_modified = entry[0], entry[1]
+        headers = {}
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def unchanged(self, key, status: int, content: bytes):
+        """
+        Returns the previously parsed reply if the new one doesn't differ
+
+        :param key: Request key
+        :param status: HTTP status of the new reply
+        :param content: Body of the new reply
+        :return: Previous result or None if the reply has to be parsed
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            self.__entries.move_to_end(key)
+            if status == self.NOT_MODIFIED or (status == 200 and entry[2] == self.__digest(content)):
+                self.not_modified += 1
+                return entry[3]
+        return None
+
+    @staticmethod
+    def __digest(content: bytes):
+        """
+        :return: Digest of the body. hash() is not used since equal hashes of different bodies
+        would return an outdated reply
+        :rtype: bytes
+        """
+        # hashlib is imported here since importing it is slow and it is only needed once replies arrive
+        from hashlib import blake2b
+        return blake2b(content, digest_size=32).digest()
+
+    def remember(self, key, response_headers, content: bytes, result):
+        """
+        Stores the validators and the parsed reply
+        """
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag is None and last_modified is None:
+            send_time = getattr(result, 'newest_send_time', None)
+            if send_time is not None and send_time.tzinfo is not None:
+                # email is imported here since importing it is slow and it is rarely needed
+                from email.utils import format_datetime
+                last_modified = format_datetime(send_time.astimezone(timezone.utc), usegmt=True)
+        with self.__lock:
+            self.__entries[key] = (etag, last_modified, self.__digest(content), result)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
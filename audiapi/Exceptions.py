@@ -0,0 +1,126 @@
+class AudiAPIError(Exception):
+    """
+    Base class of all errors reported by the backend.
+
+    Callers can branch on the type (or on retryable) instead of parsing the message
+    """
+    retryable = False
+    """
+    True if sending the same request again later might succeed
+    """
+
+    def __init__(self, message: str, status: int = None, code: str = None, description: str = None,
+                 service_path: str = None, vin: str = None):
+        """
+        :param message: Message
+        :param status: HTTP status of the reply
+        :param code: Error code of the backend, e.g. invalid_grant
+        :param description: Error description of the backend
+        :param service_path: Service path of the request, e.g. bs/vsr/v1
+        :param vin: VIN of the vehicle the request was sent for
+        """
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.description = description
+        self.service_path = service_path
+        self.vin = vin
+
+
+class AuthError(AudiAPIError):
+    """
+    Credentials or token were rejected
+    """
+    pass
+
+
+class TokenExpiredError(AuthError):
+    """
+    The token is no longer valid and has to be renewed
+    """
+    pass
+
+
+class PermissionDeniedError(AudiAPIError):
+    """
+    The account may not use the service for this vehicle
+    """
+    pass
+
+
+class NotFoundError(AudiAPIError):
+    pass
+
+
+class RateLimitError(AudiAPIError):
+    """
+    Too many requests, see retry_after
+    """
+    retryable = True
+
+    def __init__(self, message: str, retry_after: float = 0.0, **details):
+        """
+        :param retry_after: Seconds the backend asked to wait, 0 if unknown
+        """
+        super().__init__(message, **details)
+        self.retry_after = retry_after
+
+
+class ServerError(AudiAPIError):
+    retryable = True
+
+
+class TransportError(AudiAPIError):
+    """
+    The request didn't get a reply, e.g. the connection failed or timed out.
+    The original exception is chained as __cause__
+    """
+    retryable = True
+
+
+class InvalidResponseError(AudiAPIError):
+    """
+    The reply is not valid JSON, e.g. an HTML error page of a proxy
+    """
+    pass
+
+
+AUTH_CODES = frozenset(['invalid_grant', 'invalid_client', 'unauthorized_client', 'gw.error.authentication'])
+TOKEN_EXPIRED_CODES = frozenset(['invalid_token', 'expired_token'])
+PERMISSION_CODES = frozenset(['gw.error.authorization', 'access_denied'])
+NOT_FOUND_CODES = frozenset(['gw.error.notfound'])
+
+
+def error_for(status: int, code: str = None, description: str = None, service_path: str = None, vin: str = None,
+              retry_after: float = 0.0):
+    """
+    Creates the matching error for a failed reply
+
+    :param status: HTTP status of the reply
+    :param code: Error code of the backend
+    :param description: Error description of the backend
+    :param service_path: Service path of the request
+    :param vin: VIN of the vehicle the request was sent for
+    :param retry_after: Seconds the backend asked to wait
+    :return: Error
+    :rtype: AudiAPIError
+    """
+    message = 'API error: ' + str(code if code is not None else status)
+    if description:
+        message += '\n' + description
+    details = {'status': status, 'code': code, 'description': description, 'service_path': service_path,
+               'vin': vin}
+
+    if code in TOKEN_EXPIRED_CODES:
+        return TokenExpiredError(message, **details)
+    if code in AUTH_CODES or status == 401:
+        return AuthError(message, **details)
+    if code in PERMISSION_CODES or status == 403:
+        return PermissionDeniedError(message, **details)
+    if code in NOT_FOUND_CODES or status == 404:
+        return NotFoundError(message, **details)
+    if status == 429:
+        return RateLimitError(message, retry_after, **details)
+    if status is not None and status >= 500:
+        return ServerError(message, **details)
+    return AudiAPIError(message, **details)
@@ -0,0 +1,180 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from audiapi.API import API
+from audiapi.AccountPool import AccountPool
+from audiapi.RateLimit import TokenBucket
+from audiapi.Stream import FleetStream
+from audiapi.Services import VehicleStatusReportService, RemoteBatteryChargeService, RemoteTripStatisticsService, \
+    PreTripClimaService
+from audiapi.model.Vehicle import Vehicle, VehiclesResponse
+
+
+class FleetOperation:
+    """
+    Common operations which can be run for a whole fleet.
+    Any callable which takes the API and a vehicle can be used as well
+    """
+
+    @staticmethod
+    def stored_vehicle_data(api: API, vehicle: Vehicle):
+        return VehicleStatusReportService(api, vehicle).get_stored_vehicle_data()
+
+    @staticmethod
+    def battery_charge(api: API, vehicle: Vehicle):
+        return RemoteBatteryChargeService(api, vehicle).get_status()
+
+    @staticmethod
+    def short_term_trip_statistics(api: API, vehicle: Vehicle):
+        return RemoteTripStatisticsService(api, vehicle).get_latest(RemoteTripStatisticsService.SHORT_TERM)
+
+    @staticmethod
+    def long_term_trip_statistics(api: API, vehicle: Vehicle):
+        return RemoteTripStatisticsService(api, vehicle).get_latest(RemoteTripStatisticsService.LONG_TERM)
+
+    @staticmethod
+    def climater_status(api: API, vehicle: Vehicle):
+        return PreTripClimaService(api, vehicle).get_status()
+
+
+class FleetResult:
+    """
+    Outcome of an operation for a single vehicle
+    """
+
+    def __init__(self, vehicle: Vehicle, result=None, error: Exception = None):
+        self.vehicle = vehicle
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __str__(self):
+        if self.ok:
+            return self.vehicle.vin + ': ' + str(self.result)
+        return self.vehicle.vin + ': error ' + str(self.error)
+
+
+class Fleet:
+    """
+    Runs operations for many vehicles in parallel
+
+        with Fleet(api, max_workers=32, rate_limit=50) as fleet:
+            for result in fleet.run(car_service.get_vehicles(), FleetOperation.stored_vehicle_data):
+                ...
+
+    The pool size of the API should be at least max_workers, otherwise the workers
+    wait for free connections. Vehicles of several accounts are served by passing
+    an AccountPool instead of the API.
+    """
+
+    def __init__(self, api: API, max_workers: int = 16, rate_limit: float = None, burst: int = 1):
+        """
+        :param api: API used for all requests or AccountPool which provides the API for each vehicle
+        :param max_workers: Maximum number of concurrent requests
+        :param rate_limit: Maximum number of requests per second against the backend or None for no limit
+        :param burst: Number of requests which may exceed the rate limit at once
+        """
+        self._api = api
+        self.max_workers = max_workers
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audiapi-fleet')
+        self.__limiter = None
+        if rate_limit is not None:
+            self.__limiter = TokenBucket(rate_limit, burst)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stops all workers
+        """
+        self.__executor.shutdown(wait=True)
+
+    def run(self, vehicles, operation):
+        """
+        Runs the operation for all given vehicles.
+        Results are yielded as soon as they are available, so the order
+        does not match the input. Errors are reported per vehicle and never raised
+
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs
+        :param operation: Callable which takes the API and a vehicle, see FleetOperation
+        :return: Generator of FleetResult
+        """
+        pending = set()
+        for vehicle in self.to_vehicles(vehicles):
+            if len(pending) >= self.max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(self.submit(vehicle, operation))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def run_all(self, vehicles, operation):
+        """
+        Runs the operation for all given vehicles and waits for all of them
+
+        :return: Results of all vehicles
+        :rtype: list[FleetResult]
+        """
+        return list(self.run(vehicles, operation))
+
+    def submit(self, vehicle: Vehicle, operation):
+        """
+        Runs the operation for a single vehicle on the worker pool
+
+        :param vehicle: Vehicle
+        :param operation: Callable which takes the API and a vehicle, see FleetOperation
+        :return: Future of FleetResult
+        :rtype: concurrent.futures.Future
+        """
+        return self.__executor.submit(self.__call, operation, vehicle)
+
+    def stream(self, vehicles, fields=None, **options):
+        """
+        Polls the vehicles forever and yields their changes, see FleetStream
+
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs
+        :param fields: Names or IDs of the fields to watch, None for all
+        :param options: Scheduling options of FleetStream
+        :return: Generator of VehicleUpdate
+        """
+        return iter(FleetStream(self, vehicles, fields, **options))
+
+    @staticmethod
+    def to_vehicles(vehicles):
+        """
+        Converts the supported vehicle collections into Vehicle objects
+
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs
+        :return: Generator of Vehicle
+        """
+        if isinstance(vehicles, VehiclesResponse):
+            vehicles = vehicles.vehicles
+        for vehicle in vehicles:
+            if isinstance(vehicle, str):
+                vin = vehicle
+                vehicle = Vehicle()
+                vehicle.vin = vin
+            yield vehicle
+
+    def __call(self, operation, vehicle: Vehicle):
+        if self.__limiter is not None:
+            self.__limiter.acquire()
+        try:
+            return FleetResult(vehicle, operation(self.__api_for(vehicle), vehicle))
+        except Exception as e:
+            return FleetResult(vehicle, error=e)
+
+    def __api_for(self, vehicle: Vehicle):
+        if isinstance(self._api, AccountPool):
+            return self._api.api_for(vehicle.vin)
+        return self._api
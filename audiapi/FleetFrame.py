@@ -0,0 +1,231 @@
+import numpy
+
+from audiapi.model.VehicleDataResponse import VehicleDataResponse, DoorState, FieldColumns, LazyFields, Field, \
+    DECODERS, NAME_IDS
+
+
+def _numeric_ids():
+    return [field_id for field_id in Field.IDS if DECODERS[field_id].convert is not None]
+
+
+class FleetFrame:
+    """
+    Decoded fields of many vehicles as a NumPy matrix with one row per vehicle
+    and one column per numeric field of Field.IDS. Missing fields are NaN.
+
+        frame = FleetFrame.from_results(fleet.run_all(vehicles, FleetOperation.stored_vehicle_data))
+        print(frame.mean('TOTAL_RANGE'))
+        low = frame.filter(frame['TOTAL_RANGE'] < 50)
+        print(low.vins, frame.vins_where(frame.open_doors()))
+
+    Columns are plain float64 arrays, so all NumPy operations can be used on them.
+    Requires NumPy
+    """
+    FIELD_IDS = _numeric_ids()
+    """
+    IDs of the columns in order
+    """
+    COLUMNS = {field_id: index for index, field_id in enumerate(FIELD_IDS)}
+    """
+    Column index by field ID
+    """
+
+    def __init__(self, vins, values):
+        """
+        :param vins: VINs of the rows
+        :param values: Matrix of shape (vehicles, len(FIELD_IDS)), NaN for missing fields
+        """
+        self.vins = list(vins)
+        self.values = values
+        self.present = ~numpy.isnan(values)
+        """
+        Mask which is True for the fields which have been reported
+        """
+
+    @classmethod
+    def from_responses(cls, responses):
+        """
+        Builds a frame from vehicle data responses
+
+        :param responses: Dict of VehicleDataResponse by VIN or iterable of (VIN, VehicleDataResponse)
+        :rtype: FleetFrame
+        """
+        if isinstance(responses, dict):
+            responses = responses.items()
+        vins = []
+        rows = []
+        width = len(cls.FIELD_IDS)
+        nan = float('nan')
+        for vin, response in responses:
+            row = [nan] * width
+            for field_id, value in cls.__raw_values(response):
+                index = _COLUMN_BY_SPELLING.get(field_id)
+                if index is None:
+                    if field_id is None:
+                        continue
+                    index = _COLUMN_BY_SPELLING.get(field_id.lower())
+                    if index is None:
+                        continue
+                if row[index] == row[index]:
+                    # The first field wins if an ID occurs more than once
+                    continue
+                value = _DECODERS_BY_COLUMN[index].decode(value)
+                if type(value) is int or type(value) is float:
+                    row[index] = value
+            vins.append(vin)
+            rows.append(row)
+        values = numpy.array(rows, dtype=numpy.float64).reshape(len(rows), width)
+        return cls(vins, values)
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Builds a frame from the results of a fleet run, failed vehicles are left out
+
+        :param results: FleetResult of FleetOperation.stored_vehicle_data
+        :rtype: FleetFrame
+        """
+        return cls.from_responses((result.vehicle.vin, result.result) for result in results if result.ok)
+
+    @staticmethod
+    def __raw_values(response: VehicleDataResponse):
+        """
+        :return: Iterable of (field ID, raw value) without creating Field objects
+        """
+        fields = response.data_fields
+        if isinstance(fields, FieldColumns):
+            return zip(fields.ids, fields.values)
+        if isinstance(fields, LazyFields):
+            return ((raw_field.get('id'), raw_field.get('value')) for raw_field in fields.raw_fields())
+        return ((field.id, field.value) for field in fields)
+
+    def __len__(self):
+        return len(self.vins)
+
+    @classmethod
+    def column_index(cls, field: str):
+        """
+        :param field: Name or ID of the field
+        :return: Index of the column
+        :rtype: int
+        """
+        index = _COLUMN_BY_SPELLING.get(field)
+        if index is None and field is not None:
+            index = _COLUMN_BY_SPELLING.get(NAME_IDS.get(field, field.lower()))
+        if index is None:
+            raise KeyError('No numeric field ' + str(field))
+        return index
+
+    def __getitem__(self, field: str):
+        """
+        :param field: Name or ID of the field
+        :return: Values of all vehicles, NaN if missing
+        :rtype: numpy.ndarray
+        """
+        return self.values[:, self.column_index(field)]
+
+    def mask(self, field: str):
+        """
+        :param field: Name or ID of the field
+        :return: True for the vehicles which reported the field
+        :rtype: numpy.ndarray
+        """
+        return self.present[:, self.column_index(field)]
+
+    def filter(self, mask):
+        """
+        :param mask: Boolean array with one entry per vehicle
+        :return: Frame with the vehicles for which the mask is True
+        :rtype: FleetFrame
+        """
+        mask = numpy.asarray(mask, dtype=bool)
+        return FleetFrame([vin for vin, keep in zip(self.vins, mask) if keep], self.values[mask])
+
+    def vins_where(self, mask):
+        """
+        :param mask: Boolean array with one entry per vehicle
+        :return: VINs of the vehicles for which the mask is True
+        :rtype: list[str]
+        """
+        return [self.vins[index] for index in numpy.flatnonzero(mask)]
+
+    def count(self, field: str):
+        """
+        :return: Number of vehicles which reported the field
+        :rtype: int
+        """
+        return int(numpy.count_nonzero(self.mask(field)))
+
+    def sum(self, field: str):
+        """
+        :return: Sum over the vehicles which reported the field
+        :rtype: float
+        """
+        return float(self.__present_values(field).sum())
+
+    def mean(self, field: str):
+        """
+        :return: Mean over the vehicles which reported the field, NaN if none did
+        :rtype: float
+        """
+        values = self.__present_values(field)
+        return float(values.mean()) if len(values) else float('nan')
+
+    def min(self, field: str):
+        values = self.__present_values(field)
+        return float(values.min()) if len(values) else float('nan')
+
+    def max(self, field: str):
+        values = self.__present_values(field)
+        return float(values.max()) if len(values) else float('nan')
+
+    def open_doors(self):
+        """
+        :return: True for the vehicles with any open door, trunk lid or hood
+        :rtype: numpy.ndarray
+        """
+        return self.__any(_OPEN_COLUMNS, DoorState.CLOSED)
+
+    def unlocked(self):
+        """
+        :return: True for the vehicles with any unlocked door, trunk lid or hood
+        :rtype: numpy.ndarray
+        """
+        return self.__any(_LOCK_COLUMNS, DoorState.LOCKED)
+
+    def oil_change_warning(self):
+        """
+        :return: True for the vehicles which report an oil change warning
+        :rtype: numpy.ndarray
+        """
+        column = self['WARNING_OIL_CHANGE']
+        return self.mask('WARNING_OIL_CHANGE') & (column != 0)
+
+    def __any(self, columns, expected: int):
+        """
+        :return: True for the vehicles where any of the reported columns differs from the expected value
+        """
+        values = self.values[:, columns]
+        return ((values != expected) & self.present[:, columns]).any(axis=1)
+
+    def __present_values(self, field: str):
+        index = self.column_index(field)
+        return self.values[self.present[:, index], index]
+
+    def __str__(self):
+        return 'FleetFrame of ' + str(len(self)) + ' vehicles'
+
+
+_COLUMN_BY_SPELLING = {spelling: FleetFrame.COLUMNS[NAME_IDS[decoder.name]] for spelling, decoder in DECODERS.items()
+                       if NAME_IDS[decoder.name] in FleetFrame.COLUMNS}
+"""
+Column index by every registered spelling of the field IDs
+"""
+
+_DECODERS_BY_COLUMN = [DECODERS[field_id] for field_id in FleetFrame.FIELD_IDS]
+
+_OPEN_COLUMNS = [FleetFrame.COLUMNS[field_id] for field_id in FleetFrame.FIELD_IDS
+                 if Field.IDS[field_id].startswith('OPEN_STATE_')]
+
+_LOCK_COLUMNS = [FleetFrame.COLUMNS[field_id] for field_id in FleetFrame.FIELD_IDS
+                 if Field.IDS[field_id].startswith('LOCK_STATE_')]
@@ -0,0 +1,194 @@
+import bisect
+import threading
+
+
+class RequestMetrics:
+    """
+    Measurements of a single request. Times are in seconds,
+    measurements which aren't available for the transport are None
+    """
+    __slots__ = ('method', 'service_path', 'operation', 'status', 'attempts', 'error', 'total', 'dns', 'connect',
+                 'ttfb', 'request_size', 'response_size', 'decode', 'parse')
+
+    def __init__(self, method: str, service_path: str = None, operation: str = None):
+        self.method = method
+        self.service_path = service_path
+        self.operation = operation
+        """
+        URL part of the request before formatting, e.g. /vehicles/{vin}/status
+        """
+        self.status = None
+        self.attempts = 0
+        self.error = None
+        """
+        Name of the exception type if the request failed
+        """
+        self.total = None
+        self.dns = None
+        self.connect = None
+        """
+        Time for opening the connection including the TLS handshake, None if a pooled connection was used
+        """
+        self.ttfb = None
+        """
+        Time until the headers of the reply arrived
+        """
+        self.request_size = None
+        self.response_size = None
+        self.decode = None
+        """
+        Time for decoding the JSON reply (including the model if the JSON backend builds it directly)
+        """
+        self.parse = None
+        """
+        Time for converting the decoded reply into the model
+        """
+
+    def __str__(self):
+        return str({name: getattr(self, name) for name in self.__slots__})
+
+
+class Instrumentation:
+    """
+    Receives the metrics of every request sent by an API
+
+        api = API(instrumentation=MetricsRecorder())
+
+    Implementations are called from the thread (or event loop) which sent the request,
+    so they should be quick and thread safe
+    """
+
+    def record(self, metrics: RequestMetrics):
+        """
+        Called once a request is finished
+
+        :param metrics: Measurements of the request
+        """
+        pass
+
+
+class Histogram:
+    """
+    Histogram with fixed bucket bounds
+    """
+
+    def __init__(self, bounds):
+        """
+        :param bounds: Sorted upper bounds of the buckets, values above the last one go into an overflow bucket
+        """
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float):
+        """
+        Estimates a quantile by interpolating within its bucket
+
+        :param q: Quantile between 0 and 1
+        :rtype: float
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.max
+                if i < len(self.bounds):
+                    upper = min(self.bounds[i], self.max)
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        """
+        :return: Cumulative bucket counts in the format of common exporters
+        :rtype: dict
+        """
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + [float('inf')], self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'count': self.count, 'sum': self.sum, 'max': self.max, 'buckets': buckets,
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99)}
+
+
+class MetricsRecorder(Instrumentation):
+    """
+    Keeps histograms of all measurements in memory, labeled by service path and operation
+
+        recorder = MetricsRecorder()
+        api = API(instrumentation=recorder)
+        ...
+        for entry in recorder.snapshot():
+            print(entry['service_path'], entry['operation'], entry['metric'], entry['p99'])
+    """
+    LATENCY_BOUNDS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+    SIZE_BOUNDS = [256, 1024, 4096, 16384, 65536, 262144, 1048576]
+    LATENCY_METRICS = ('total', 'dns', 'connect', 'ttfb', 'decode', 'parse')
+    SIZE_METRICS = ('request_size', 'response_size')
+
+    def __init__(self):
+        self.__histograms = {}
+        self.__statuses = {}
+        self.__lock = threading.Lock()
+
+    def record(self, metrics: RequestMetrics):
+        label = (metrics.service_path, metrics.operation)
+        outcome = metrics.error if metrics.error is not None else metrics.status
+        with self.__lock:
+            histograms = self.__histograms.get(label)
+            if histograms is None:
+                histograms = {}
+                for name in self.LATENCY_METRICS:
+                    histograms[name] = Histogram(self.LATENCY_BOUNDS)
+                for name in self.SIZE_METRICS:
+                    histograms[name] = Histogram(self.SIZE_BOUNDS)
+                self.__histograms[label] = histograms
+            for name, histogram in histograms.items():
+                value = getattr(metrics, name)
+                if value is not None:
+                    histogram.observe(value)
+            key = label + (outcome,)
+            self.__statuses[key] = self.__statuses.get(key, 0) + 1
+
+    def snapshot(self):
+        """
+        :return: One entry per label and metric with count, sum, max, cumulative buckets and quantiles
+        :rtype: list[dict]
+        """
+        result = []
+        with self.__lock:
+            for (service_path, operation), histograms in self.__histograms.items():
+                for name, histogram in histograms.items():
+                    if histogram.count == 0:
+                        continue
+                    entry = {'service_path': service_path, 'operation': operation, 'metric': name}
+                    entry.update(histogram.snapshot())
+                    result.append(entry)
+        return result
+
+    def outcomes(self):
+        """
+        :return: Number of requests by (service path, operation, HTTP status or error name)
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict(self.__statuses)
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+            self.__statuses.clear()
@@ -0,0 +1,241 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+
+from audiapi.API import API
+from audiapi.Exceptions import AudiAPIError
+from audiapi.Services import VehicleStatusReportService, RemoteHonkFlashService, PreTripClimaService
+from audiapi.model.ClimaRequest import ClimaActionStatus
+from audiapi.model.HonkFlash import HonkFlashAction, RemoteHonkFlashActionStatus
+from audiapi.model.RequestStatus import RequestStatus
+from audiapi.model.Vehicle import Vehicle
+
+
+class JobFailedError(AudiAPIError):
+    """
+    Raised if the backend reports that an asynchronous job failed
+    """
+    pass
+
+
+class JobPoller:
+    """
+    Drives asynchronous backend jobs (vehicle data requests, honk & flash, clima actions)
+    until they are finished.
+
+    A single scheduler thread keeps all outstanding jobs and hands due polls to a small
+    worker pool, so thousands of jobs can be pending without blocking a thread each.
+    Polls are spaced using exponential backoff with jitter and every job has a deadline.
+
+    All methods return a concurrent.futures.Future, use asyncio.wrap_future() to await it.
+    """
+
+    PENDING = object()
+    """
+    Returned by poll functions if the job is not finished yet
+    """
+
+    def __init__(self, api: API, max_workers: int = 8, initial_delay: float = 1.0, max_delay: float = 30.0,
+                 factor: float = 2.0, jitter: float = 0.5, timeout: float = 120.0):
+        """
+        :param api: API used for all requests
+        :param max_workers: Number of concurrent polls
+        :param initial_delay: Seconds before the first status poll
+        :param max_delay: Upper limit of the delay between two polls
+        :param factor: Factor by which the delay grows after each poll
+        :param jitter: Fraction of the delay which is randomized (0 - 1)
+        :param timeout: Default deadline of a job in seconds
+        """
+        self._api = api
+        self.__initial_delay = initial_delay
+        self.__max_delay = max_delay
+        self.__factor = factor
+        self.__jitter = jitter
+        self.__timeout = timeout
+        self.__queue = []
+        self.__counter = itertools.count()
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audiapi-poller')
+        self.__scheduler = threading.Thread(target=self.__run, name='audiapi-poller-scheduler', daemon=True)
+        self.__scheduler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stops polling. Futures of unfinished jobs are cancelled
+        """
+        with self.__condition:
+            self.__closed = True
+            jobs = [entry[2] for entry in self.__queue]
+            self.__queue.clear()
+            self.__condition.notify()
+        self.__scheduler.join()
+        self.__executor.shutdown(wait=True)
+        for job in jobs:
+            job.future.cancel()
+
+    def current_vehicle_data(self, vehicle: Vehicle, timeout: float = None):
+        """
+        Requests the current data from the vehicle and waits until the vehicle reported it
+
+        :param vehicle: Vehicle
+        :param timeout: Deadline in seconds, defaults to the poller timeout
+        :return: Future of VehicleDataResponse
+        :rtype: Future
+        """
+        service = VehicleStatusReportService(self._api, vehicle)
+        request_id = None
+
+        def poll():
+            nonlocal request_id
+            if request_id is None:
+                request_id = service.request_current_vehicle_data().request_id
+                return self.PENDING
+            status = service.get_request_status(request_id).status
+            if status == RequestStatus.SUCCESS:
+                return service.get_requested_current_vehicle_data(request_id)
+            if status == RequestStatus.FAIL:
+                raise JobFailedError('Vehicle data request ' + request_id + ' failed for ' + vehicle.vin,
+                                     service_path=service._get_path(), vin=vehicle.vin)
+            return self.PENDING
+
+        return self.submit(poll, timeout, delay=0)
+
+    def honk_flash(self, vehicle: Vehicle, action: HonkFlashAction, timeout: float = None):
+        """
+        Waits until the given honk & flash action is finished
+
+        :param vehicle: Vehicle
+        :param action: Action as returned by RemoteHonkFlashService
+        :param timeout: Deadline in seconds, defaults to the poller timeout
+        :return: Future of RemoteHonkFlashActionStatus
+        :rtype: Future
+        """
+        service = RemoteHonkFlashService(self._api, vehicle)
+
+        def poll():
+            status = service.get_status(action)
+            if status.status == RemoteHonkFlashActionStatus.SUCCESS:
+                return status
+            if status.status == RemoteHonkFlashActionStatus.FAIL:
+                raise JobFailedError('Honk & flash action ' + str(action.id) + ' failed: ' + str(status.reason),
+                                     service_path=service._get_path(), vin=vehicle.vin)
+            return self.PENDING
+
+        return self.submit(poll, timeout)
+
+    def clima_action(self, vehicle: Vehicle, action_id: str, timeout: float = None):
+        """
+        Waits until the given clima action is finished
+
+        :param vehicle: Vehicle
+        :param action_id: ID of the action
+        :param timeout: Deadline in seconds, defaults to the poller timeout
+        :return: Future of ClimaActionStatus
+        :rtype: Future
+        """
+        service = PreTripClimaService(self._api, vehicle)
+
+        def poll():
+            status = ClimaActionStatus(service.get_request_status(action_id))
+            if status.state == ClimaActionStatus.SUCCESS:
+                return status
+            if status.state == ClimaActionStatus.FAIL:
+                raise JobFailedError('Clima action ' + str(action_id) + ' failed: ' + str(status.error_code),
+                                     code=status.error_code, service_path=service._get_path(), vin=vehicle.vin)
+            return self.PENDING
+
+        return self.submit(poll, timeout)
+
+    def submit(self, poll, timeout: float = None, delay: float = None):
+        """
+        Schedules a custom job
+
+        :param poll: Callable without arguments which returns JobPoller.PENDING until the job is finished,
+        any other value is used as result. Exceptions fail the job
+        :param timeout: Deadline in seconds, defaults to the poller timeout
+        :param delay: Seconds before the first poll, defaults to the initial delay
+        :return: Future of the job result
+        :rtype: Future
+        """
+        if timeout is None:
+            timeout = self.__timeout
+        if delay is None:
+            delay = self.__initial_delay
+        job = _Job(poll, time.monotonic() + timeout)
+        self.__schedule(job, delay)
+        return job.future
+
+    def __schedule(self, job, delay: float):
+        with self.__condition:
+            if self.__closed:
+                job.future.cancel()
+                return
+            heapq.heappush(self.__queue, (time.monotonic() + delay, next(self.__counter), job))
+            self.__condition.notify()
+
+    def __next_delay(self, attempt: int):
+        delay = min(self.__max_delay, self.__initial_delay * self.__factor ** attempt)
+        return delay * (1 - self.__jitter * random.random())
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__closed and (not self.__queue or self.__queue[0][0] > time.monotonic()):
+                    timeout = self.__queue[0][0] - time.monotonic() if self.__queue else None
+                    self.__condition.wait(timeout)
+                if self.__closed:
+                    return
+                due = []
+                now = time.monotonic()
+                while self.__queue and self.__queue[0][0] <= now:
+                    due.append(heapq.heappop(self.__queue)[2])
+            for job in due:
+                self.__executor.submit(self.__poll, job)
+
+    def __poll(self, job):
+        if job.future.cancelled():
+            return
+        try:
+            result = job.poll()
+        except Exception as e:
+            self.__finish(job, exception=e)
+            return
+
+        if result is not self.PENDING:
+            self.__finish(job, result=result)
+            return
+        delay = self.__next_delay(job.attempt)
+        job.attempt += 1
+        if time.monotonic() + delay > job.deadline:
+            self.__finish(job, exception=TimeoutError('Job did not finish before its deadline'))
+            return
+        self.__schedule(job, delay)
+
+    @staticmethod
+    def __finish(job, result=None, exception: Exception = None):
+        try:
+            if exception is not None:
+                job.future.set_exception(exception)
+            else:
+                job.future.set_result(result)
+        except InvalidStateError:
+            # Cancelled by the caller in the meantime
+            pass
+
+
+class _Job:
+    def __init__(self, poll, deadline: float):
+        self.poll = poll
+        self.deadline = deadline
+        self.attempt = 0
+        self.future = Future()
@@ -0,0 +1,197 @@
+import json
+from typing import Any, List, Optional
+
+from audiapi.model.RequestStatus import RequestStatus
+from audiapi.model.Vehicle import VehiclesResponse, Vehicle
+from audiapi.model.VehicleDataResponse import VehicleDataResponse, Field
+
+
+class JsonBackend:
+    """
+    Decodes API replies using the json module of the standard library
+    """
+    NAME = 'json'
+    decode_errors = (ValueError,)
+    """
+    Errors raised by loads for invalid JSON
+    """
+
+    def loads(self, content):
+        """
+        Decodes the given JSON document
+
+        :param content: JSON as bytes or str
+        :return: Decoded data
+        """
+        return json.loads(content)
+
+    def decode_model(self, content, parser):
+        """
+        Decodes the reply directly into the model the parser would create,
+        without building the generic dict first
+
+        :param content: JSON as bytes or str
+        :param parser: Parser which has been passed to the API
+        :return: Model or None if the backend can't decode this model (or the reply
+        doesn't match it, e.g. for errors). The generic path is used in that case
+        """
+        return None
+
+    def __str__(self):
+        return self.NAME
+
+
+class OrjsonBackend(JsonBackend):
+    NAME = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.__loads = orjson.loads
+
+    def loads(self, content):
+        return self.__loads(content)
+
+
+class UjsonBackend(JsonBackend):
+    NAME = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.__loads = ujson.loads
+
+    def loads(self, content):
+        return self.__loads(content)
+
+
+class MsgspecBackend(JsonBackend):
+    """
+    Uses msgspec. Vehicle data, vehicle list and request status replies are decoded
+    into typed structs which skip all unused keys and are then turned into models
+    """
+    NAME = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self.__decoder = msgspec.json.Decoder()
+        self.__decode_error = msgspec.DecodeError
+        self.decode_errors = (msgspec.DecodeError, ValueError)
+        self.__models = {}
+        for parser, struct_type, build in _msgspec_models(msgspec):
+            self.__models[parser] = (msgspec.json.Decoder(struct_type), build)
+
+    def loads(self, content):
+        return self.__decoder.decode(content)
+
+    def decode_model(self, content, parser):
+        entry = self.__models.get(parser)
+        if entry is None:
+            return None
+        decoder, build = entry
+        try:
+            return build(decoder.decode(content))
+        except self.__decode_error:
+            return None
+
+
+def _msgspec_models(msgspec):
+    """
+    Defines the typed schemas. Only called if msgspec is installed
+
+    :return: List of (parser, struct type, function which builds the model from the struct)
+    """
+
+    class RawField(msgspec.Struct):
+        id: Optional[str] = None
+        unit: Optional[str] = None
+        value: Any = None
+        tsCarCaptured: Optional[str] = None
+        tsCarSent: Optional[str] = None
+        milCarCaptured: Any = None
+        milCarSent: Any = None
+        textId: Optional[str] = None
+
+    class RawData(msgspec.Struct):
+        field: Optional[List[RawField]] = None
+
+    class RawVehicleData(msgspec.Struct):
+        data: List[RawData] = []
+
+    class RawVehicleDataResponse(msgspec.Struct):
+        vehicleData: Optional[RawVehicleData] = None
+
+    class VehicleDataRoot(msgspec.Struct):
+        StoredVehicleDataResponse: Optional[RawVehicleDataResponse] = None
+        CurrentVehicleDataByRequestResponse: Optional[RawVehicleDataResponse] = None
+
+    def build_vehicle_data(root):
+        response = root.StoredVehicleDataResponse
+        if response is None:
+            response = root.CurrentVehicleDataByRequestResponse
+        if response is None:
+            return None
+        fields = []
+        if response.vehicleData is not None:
+            for data in response.vehicleData.data:
+                if data.field is None:
+                    continue
+                for f in data.field:
+                    fields.append(Field.from_values(f.id, f.unit, f.value, f.tsCarCaptured, f.tsCarSent,
+                                                    f.milCarCaptured, f.milCarSent, f.textId))
+        return VehicleDataResponse.from_fields(fields)
+
+    class RawVehicle(msgspec.Struct):
+        VIN: Optional[str] = None
+        CSID: Optional[str] = None
+        registered: Optional[str] = None
+
+    class RawVehicles(msgspec.Struct):
+        CSIDVins: List[RawVehicle]
+        vinsOnBlacklist: Any = None
+
+    class VehiclesRoot(msgspec.Struct):
+        getUserVINsResponse: RawVehicles
+
+    def build_vehicles(root):
+        response = root.getUserVINsResponse
+        return VehiclesResponse.from_values(
+            [Vehicle.from_values(item.VIN, item.CSID, item.registered) for item in response.CSIDVins],
+            response.vinsOnBlacklist)
+
+    class RawRequestStatus(msgspec.Struct):
+        status: str
+        vin: str
+
+    class RequestStatusRoot(msgspec.Struct):
+        requestStatusResponse: RawRequestStatus
+
+    def build_request_status(root):
+        return RequestStatus.from_values(root.requestStatusResponse.status, root.requestStatusResponse.vin)
+
+    return [(VehicleDataResponse, VehicleDataRoot, build_vehicle_data),
+            (VehiclesResponse, VehiclesRoot, build_vehicles),
+            (RequestStatus, RequestStatusRoot, build_request_status)]
+
+
+BACKENDS = [MsgspecBackend, OrjsonBackend, UjsonBackend, JsonBackend]
+"""
+Available backends, ordered by preference
+"""
+
+
+def get_backend(name: str = None):
+    """
+    Returns a JSON backend
+
+    :param name: Name of the backend (e.g. orjson) or None to pick the fastest one which is installed
+    :return: Backend
+    :rtype: JsonBackend
+    """
+    for backend in BACKENDS:
+        if name is not None and backend.NAME != name:
+            continue
+        try:
+            return backend()
+        except ImportError:
+            if name is not None:
+                raise
+    raise ValueError('Unknown JSON backend: ' + str(name))
@@ -0,0 +1,317 @@
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket rate limiter
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: Tokens which are refilled per second
+        :param burst: Maximum number of tokens which can be taken at once
+        """
+        self.__rate = rate
+        self.__capacity = max(burst, 1)
+        self.__tokens = float(self.__capacity)
+        self.__updated = time.monotonic()
+        self.__waiting = deque()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self.__rate
+
+    @rate.setter
+    def rate(self, rate: float):
+        with self.__lock:
+            self.__refill(time.monotonic())
+            self.__rate = rate
+
+    @property
+    def queue_depth(self):
+        """
+        :return: Number of callers which still wait for their token
+        :rtype: int
+        """
+        with self.__lock:
+            now = time.monotonic()
+            while self.__waiting and self.__waiting[0] <= now:
+                self.__waiting.popleft()
+            return len(self.__waiting)
+
+    @property
+    def wait_time(self):
+        """
+        :return: Seconds a caller would have to wait for a token now
+        :rtype: float
+        """
+        with self.__lock:
+            self.__refill(time.monotonic())
+            if self.__tokens >= 1:
+                return 0.0
+            return (1 - self.__tokens) / self.__rate
+
+    def reserve(self):
+        """
+        Takes a token. If none is available the token is borrowed from the future
+        and the caller has to wait before using it
+
+        :return: Seconds the caller has to wait
+        :rtype: float
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.__tokens -= 1
+            if self.__tokens >= 0:
+                return 0.0
+            delay = -self.__tokens / self.__rate
+            self.__waiting.append(now + delay)
+            return delay
+
+    def acquire(self):
+        """
+        Takes a token, blocks until it is available
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Hands out no tokens for the given time
+
+        :param seconds: Pause in seconds
+        """
+        with self.__lock:
+            self.__refill(time.monotonic())
+            self.__tokens = min(self.__tokens, -seconds * self.__rate)
+
+    def __refill(self, now: float):
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+        self.__updated = now
+
+
+class RateLimitStats:
+    """
+    State of the limit of a single service path
+    """
+
+    def __init__(self, rate: float, max_rate: float, queue_depth: int, wait_time: float, requests: int,
+                 waited: float, throttled: int):
+        self.rate = rate
+        """
+        Current requests per second
+        """
+        self.max_rate = max_rate
+        """
+        Configured requests per second
+        """
+        self.queue_depth = queue_depth
+        """
+        Number of requests waiting to be sent
+        """
+        self.wait_time = wait_time
+        """
+        Seconds a new request would have to wait
+        """
+        self.requests = requests
+        self.waited = waited
+        """
+        Total seconds requests had to wait
+        """
+        self.throttled = throttled
+        """
+        Number of replies which made the limit slow down
+        """
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
+class _Limit:
+    """
+    Bucket and counters of a single service path
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_rate = rate
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+        self.decreased_at = None
+        """
+        Time of the last decrease of the rate (time.monotonic)
+        """
+
+
+class RateLimiter:
+    """
+    Limits the request rate of an API, overall and per service path
+
+        limiter = RateLimiter(rate=20, rates={'bs/vsr/v1': 5}, adaptive=True)
+        api = API(rate_limiter=limiter)
+
+    An adaptive limiter halves the rate of a service path when the backend answers
+    with 429 or a server error and pauses it for the time requested by Retry-After.
+    The rate is decreased once per overload: replies to requests which were sent before
+    the last decrease don't decrease it again. Each successful reply raises the rate
+    again a bit, up to the configured rate.
+
+    The queue depth and wait time reported by stats can be used to apply backpressure,
+    e.g. by submitting less work while requests queue up.
+    """
+    OVERALL = None
+    """
+    Key of the limit which applies to all service paths
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1, rates: dict = None, adaptive: bool = False,
+                 min_rate: float = 0.1, decrease: float = 0.5, recovery: float = 0.02):
+        """
+        :param rate: Maximum number of requests per second over all service paths or None for no limit
+        :param burst: Number of requests which may exceed the rates at once
+        :param rates: Maximum number of requests per second by service path (e.g. bs/vsr/v1)
+        :param adaptive: True to slow down when the backend is overloaded
+        :param min_rate: Lowest rate an adaptive limit is reduced to
+        :param decrease: Factor the rate is multiplied with on overload replies
+        :param recovery: Share of the configured rate which is added for each successful reply
+        """
+        self.__adaptive = adaptive
+        self.__min_rate = min_rate
+        self.__decrease = decrease
+        self.__recovery = recovery
+        self.__limits = {}
+        if rate is not None:
+            self.__limits[self.OVERALL] = _Limit(rate, burst)
+        if rates is not None:
+            for service_path, path_rate in rates.items():
+                self.__limits[service_path] = _Limit(path_rate, burst)
+        self.__lock = threading.Lock()
+
+    def reserve(self, service_path: str = None):
+        """
+        Takes a token for a request to the given service path
+
+        :param service_path: Service path of the request
+        :return: Seconds the caller has to wait before sending the request
+        :rtype: float
+        """
+        delay = 0.0
+        for limit in self.__applicable(service_path):
+            delay = max(delay, limit.bucket.reserve())
+        for limit in self.__applicable(service_path):
+            with self.__lock:
+                limit.requests += 1
+                limit.waited += delay
+        return delay
+
+    def acquire(self, service_path: str = None):
+        """
+        Takes a token for a request to the given service path, blocks until it is available
+        """
+        delay = self.reserve(service_path)
+        if delay > 0:
+            time.sleep(delay)
+
+    def feedback(self, service_path: str, status: int, retry_after=None, sent_at: float = None):
+        """
+        Adapts the rate of the service path to the reply of the backend.
+        Only has an effect on adaptive limiters
+
+        :param service_path: Service path of the request
+        :param status: HTTP status of the reply
+        :param retry_after: Value of the Retry-After header or None
+        :param sent_at: Time the request was sent (time.monotonic) or None if unknown.
+        Without it, the rate is decreased at most once per request interval of the current rate
+        """
+        if not self.__adaptive:
+            return
+        limit = self.__limits.get(service_path)
+        if limit is None:
+            limit = self.__limits.get(self.OVERALL)
+        if limit is None:
+            return
+
+        bucket = limit.bucket
+        if status == 429 or status >= 500:
+            now = time.monotonic()
+            with self.__lock:
+                limit.throttled += 1
+                last = limit.decreased_at
+                if sent_at is not None:
+                    # Requests sent before the last decrease belong to the overload it already handled
+                    decrease = last is None or sent_at >= last
+                else:
+                    decrease = last is None or now - last >= 1.0 / bucket.rate
+                if decrease:
+                    limit.decreased_at = now
+                    bucket.rate = max(self.__min_rate, bucket.rate * self.__decrease)
+            pause = self.parse_retry_after(retry_after)
+            if pause > 0:
+                bucket.pause(pause)
+        elif bucket.rate < limit.max_rate:
+            with self.__lock:
+                bucket.rate = min(limit.max_rate, bucket.rate + limit.max_rate * self.__recovery)
+
+    def queue_depth(self, service_path: str = None):
+        """
+        :param service_path: Service path or None for the overall limit
+        :return: Number of requests which are waiting to be sent
+        :rtype: int
+        """
+        return max([limit.bucket.queue_depth for limit in self.__applicable(service_path)], default=0)
+
+    def wait_time(self, service_path: str = None):
+        """
+        :param service_path: Service path or None for the overall limit
+        :return: Seconds a request would have to wait now
+        :rtype: float
+        """
+        return max([limit.bucket.wait_time for limit in self.__applicable(service_path)], default=0.0)
+
+    def stats(self):
+        """
+        :return: State of all limits by service path, the overall limit has the key OVERALL
+        :rtype: dict[str, RateLimitStats]
+        """
+        result = {}
+        for service_path, limit in self.__limits.items():
+            bucket = limit.bucket
+            result[service_path] = RateLimitStats(bucket.rate, limit.max_rate, bucket.queue_depth, bucket.wait_time,
+                                                  limit.requests, limit.waited, limit.throttled)
+        return result
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        :param value: Retry-After header in seconds or as HTTP date
+        :return: Seconds to wait, 0 if unknown
+        :rtype: float
+        """
+        if value is None:
+            return 0.0
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+
+    def __applicable(self, service_path: str):
+        limits = []
+        overall = self.__limits.get(self.OVERALL)
+        if overall is not None:
+            limits.append(overall)
+        if service_path is not None:
+            limit = self.__limits.get(service_path)
+            if limit is not None:
+                limits.append(limit)
+        return limits
@@ -0,0 +1,247 @@
+import random
+import threading
+import time
+
+from audiapi.Exceptions import AudiAPIError
+
+
+class CircuitOpenError(AudiAPIError):
+    """
+    Raised instead of sending a request while the circuit of its service path is open
+    """
+
+    def __init__(self, service_path: str, retry_in: float):
+        super().__init__('Circuit of ' + str(service_path) + ' is open, retry in ' + str(round(retry_in, 1)) + 's',
+                         service_path=service_path)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single service path.
+
+    After failure_threshold consecutive failures the circuit opens and requests fail
+    right away. Once reset_timeout passed a single trial request is let through,
+    which closes the circuit again on success
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, service_path: str, failure_threshold: int = 5, reset_timeout: float = 30.0, listener=None):
+        """
+        :param service_path: Service path this breaker guards
+        :param failure_threshold: Number of consecutive failures which open the circuit
+        :param reset_timeout: Seconds the circuit stays open before a trial request is sent
+        :param listener: Callable which receives the service path, old and new state on every change
+        """
+        self.service_path = service_path
+        self.__failure_threshold = failure_threshold
+        self.__reset_timeout = reset_timeout
+        self.__listener = listener
+        self.__state = self.CLOSED
+        self.__opened_at = 0.0
+        self.__trial_running = False
+        self.__lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        """
+        Number of requests which failed fast because the circuit was open
+        """
+
+    @property
+    def state(self):
+        with self.__lock:
+            if self.__state == self.OPEN and time.monotonic() - self.__opened_at >= self.__reset_timeout:
+                return self.HALF_OPEN
+            return self.__state
+
+    def check(self):
+        """
+        Called before sending a request
+
+        :return: True if the request is the trial request of the half-open circuit.
+        It must end with record_success, record_failure, record_neutral or abort_trial
+        :rtype: bool
+        :raises CircuitOpenError: If the request must not be sent
+        """
+        with self.__lock:
+            if self.__state == self.CLOSED:
+                return False
+            remaining = self.__reset_timeout - (time.monotonic() - self.__opened_at)
+            if self.__state == self.OPEN and remaining <= 0:
+                self.__change(self.HALF_OPEN)
+            if self.__state == self.HALF_OPEN and not self.__trial_running:
+                self.__trial_running = True
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(self.service_path, max(remaining, 0.0))
+
+    def record_success(self):
+        with self.__lock:
+            self.consecutive_failures = 0
+            self.__trial_running = False
+            if self.__state != self.CLOSED:
+                self.__change(self.CLOSED)
+
+    def record_neutral(self):
+        """
+        Records a reply which neither proves that the service works nor that it fails (e.g. 429).
+        A half-open circuit stays half-open and lets the next request through as trial
+        """
+        with self.__lock:
+            self.__trial_running = False
+
+    def abort_trial(self):
+        """
+        Called if the trial request ended without a reply (e.g. it was cancelled).
+        The circuit opens again, so the next trial is sent after reset_timeout
+        """
+        with self.__lock:
+            if not self.__trial_running:
+                return
+            self.__trial_running = False
+            if self.__state == self.HALF_OPEN:
+                self.__opened_at = time.monotonic()
+                self.__change(self.OPEN)
+
+    def record_failure(self):
+        with self.__lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            trial = self.__trial_running
+            self.__trial_running = False
+            if trial or (self.__state == self.CLOSED and self.consecutive_failures >= self.__failure_threshold):
+                self.__opened_at = time.monotonic()
+                self.__change(self.OPEN)
+
+    def __change(self, state: str):
+        old = self.__state
+        self.__state = state
+        if self.__listener is not None and old != state:
+            self.__listener(self.service_path, old, state)
+
+    def __str__(self):
+        return str(self.service_path) + ': ' + self.state + ', ' + str(self.failures) + ' failures, ' + \
+               str(self.retries) + ' retries, ' + str(self.rejected) + ' rejected'
+
+
+class RetryPolicy:
+    """
+    Retries failed requests and guards every service path with a CircuitBreaker
+
+        api = API(retry=RetryPolicy(max_attempts=4))
+
+    Only GET requests are retried, since they don't change anything. POST and PUT requests
+    (e.g. honk and flash or climater actions) are sent once, their failures still count
+    for the circuit breaker. Transport errors and server errors count as failures,
+    429 replies are retried without affecting the breaker (they don't close a half-open circuit either).
+    Retries of 429 and 503 replies wait at least as long as the Retry-After header asks.
+
+    API sends its requests without retries on the transport level if a RetryPolicy is given,
+    so max_attempts is the total number of attempts
+    """
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+    RETRY_AFTER_STATUSES = frozenset([429, 503])
+
+    def __init__(self, max_attempts: int = 3, backoff: float = 0.5, max_backoff: float = 10.0, jitter: float = 0.5,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, listener=None):
+        """
+        :param max_attempts: Maximum number of attempts of a GET request
+        :param backoff: Delay in seconds before the first retry, doubled for every further retry
+        :param max_backoff: Maximum delay between attempts
+        :param jitter: Share of the delay which is randomized
+        :param failure_threshold: Number of consecutive failures which open the circuit of a service path
+        :param reset_timeout: Seconds a circuit stays open before a trial request is sent
+        :param listener: Callable which receives the service path, old and new state on every circuit change
+        """
+        self.max_attempts = max(max_attempts, 1)
+        self.__backoff = backoff
+        self.__max_backoff = max_backoff
+        self.__jitter = jitter
+        self.__failure_threshold = failure_threshold
+        self.__reset_timeout = reset_timeout
+        self.__listener = listener
+        self.__breakers = {}
+        self.__lock = threading.Lock()
+
+    def breaker(self, service_path: str):
+        """
+        :param service_path: Service path
+        :return: Circuit breaker of the service path
+        :rtype: CircuitBreaker
+        """
+        breaker = self.__breakers.get(service_path)
+        if breaker is None:
+            with self.__lock:
+                breaker = self.__breakers.get(service_path)
+                if breaker is None:
+                    breaker = CircuitBreaker(service_path, self.__failure_threshold, self.__reset_timeout,
+                                             self.__listener)
+                    self.__breakers[service_path] = breaker
+        return breaker
+
+    def check(self, service_path: str):
+        """
+        Called before every attempt
+
+        :return: True if the attempt is the trial request of a half-open circuit, see abort_trial
+        :rtype: bool
+        :raises CircuitOpenError: If the circuit of the service path is open
+        """
+        return self.breaker(service_path).check()
+
+    def abort_trial(self, service_path: str):
+        """
+        Called if a trial attempt ended without reaching on_reply (e.g. it was cancelled or
+        building the request failed), so the circuit doesn't wait for it forever
+        """
+        self.breaker(service_path).abort_trial()
+
+    def on_reply(self, service_path: str, attempt: int, status: int = None, idempotent: bool = True,
+                 retry_after: float = 0.0):
+        """
+        Records the outcome of an attempt
+
+        :param service_path: Service path of the request
+        :param attempt: Number of the attempt, starting at 0
+        :param status: HTTP status or None if the request failed on the transport level
+        :param idempotent: True if the request may be sent again
+        :param retry_after: Seconds the backend asked to wait (Retry-After), respected for 429 and 503 replies
+        :return: Seconds to wait before the next attempt or None if the request is done
+        """
+        breaker = self.breaker(service_path)
+        if status is None or status >= 500:
+            breaker.record_failure()
+        elif status == 429:
+            # Throttling says nothing about the health of the service
+            breaker.record_neutral()
+        else:
+            breaker.record_success()
+
+        if (status is not None and status not in self.RETRY_STATUSES) or not idempotent \
+                or attempt + 1 >= self.max_attempts:
+            return None
+        with self.__lock:
+            breaker.retries += 1
+        if status in self.RETRY_AFTER_STATUSES:
+            return max(self.delay(attempt), retry_after)
+        return self.delay(attempt)
+
+    def delay(self, attempt: int):
+        """
+        :param attempt: Number of the failed attempt, starting at 0
+        :return: Seconds to wait before the next attempt
+        :rtype: float
+        """
+        delay = min(self.__max_backoff, self.__backoff * (2 ** attempt))
+        return delay * (1 - self.__jitter * random.random())
+
+    def stats(self):
+        """
+        :return: Circuit breakers by service path
+        :rtype: dict[str, CircuitBreaker]
+        """
+        return dict(self.__breakers)
@@ -1,42 +1,128 @@
+import functools
 from abc import abstractmethod, ABCMeta
 
-from audiapi.API import Token, API
+from audiapi.API import Token, BaseAPI
 from audiapi.model.ClimaRequest import ClimaRequestFactory
 from audiapi.model.CurrentVehicleDataResponse import CurrentVehicleDataResponse
 from audiapi.model.HonkFlash import HonkFlashAction, RemoteHonkFlashActionStatus
 from audiapi.model.RequestStatus import RequestStatus
+from audiapi.model.TripData import TripDataResponse
 from audiapi.model.Vehicle import VehiclesResponse, Vehicle
 from audiapi.model.VehicleDataResponse import VehicleDataResponse
 from audiapi.model.BatteryChargeResponse import BatteryChargeResponse
 
 
 class Service(metaclass=ABCMeta):
+    """
+    Base class of all services.
+
+    Services can be used with the blocking API as well as with the AsyncAPI.
+    With the AsyncAPI every method which sends a request returns an awaitable
+    """
     BASE_URL = 'https://msg.audi.de/fs-car'
     COMPANY = 'Audi'
     COUNTRY = 'DE'
 
-    def __init__(self, api: API):
+    def __init__(self, api: BaseAPI):
         self._api = api
         """
         API for communicating
 
-        :type _api: API
+        :type _api: BaseAPI
         """
+        self.__templates = {}
+        self.__templates_key = None
 
     def url(self, part, **format_data):
         """
-        Builds a full URL using the given parts
+        Builds a full URL using the given parts.
+        The template of every part is built once and reused by later calls
 
         :param part URL part which should be added at the end
         :param format_data: Format arguments
         :return: URL
         :rtype: str
         """
+        key = self._url_key()
+        if key != self.__templates_key:
+            self.__templates = {}
+            self.__templates_key = key
+        entry = self.__templates.get(part)
+        if entry is None:
+            template = self._url_template(part)
+            # Templates without placeholders are already the URL
+            entry = (template, '{' in template)
+            self.__templates[part] = entry
+        template, has_placeholders = entry
+        if has_placeholders:
+            return template.format(**format_data)
+        return template
+
+    def _url_template(self, part):
+        """
+        Builds the URL template of a part
+
+        :param part: URL part which should be added at the end
+        :return: URL with the placeholders of the part
+        :rtype: str
+        """
         url = self.BASE_URL + '/' + self._get_path()
         if self._use_company():
             url += '/' + self.COMPANY + '/' + self.COUNTRY
-        url += part
-        return url.format(**format_data)
+        return url + part
+
+    def _url_key(self):
+        """
+        :return: Everything the URL templates depend on besides the part, they are rebuilt if it changes
+        """
+        return self.BASE_URL, self.COMPANY, self.COUNTRY
+
+    def _get(self, part, parser=None, **format_data):
+        """
+        Sends a GET request to the given URL part
+
+        :param part: URL part which should be added at the end
+        :param parser: Callable which converts the reply into a model object
+        :param format_data: Format arguments of the URL part
+        """
+        return self._api.get(self.url(part, **format_data), parser=parser, service_path=self._get_path(),
+                             vin=self._get_vin(format_data), operation=part)
+
+    def _post(self, part, data=None, use_json: bool = True, parser=None, **format_data):
+        """
+        Sends a POST request to the given URL part
+
+        :param part: URL part which should be added at the end
+        :param data: Request body
+        :param use_json: True if the data should be sent as JSON
+        :param parser: Callable which converts the reply into a model object
+        :param format_data: Format arguments of the URL part
+        """
+        return self._api.post(self.url(part, **format_data), data=data, use_json=use_json, parser=parser,
+                              service_path=self._get_path(), vin=self._get_vin(format_data), operation=part)
+
+    def _put(self, part, data=None, headers=None, parser=None, **format_data):
+        """
+        Sends a PUT request to the given URL part
+
+        :param part: URL part which should be added at the end
+        :param data: Request body
+        :param headers: Additional headers
+        :param parser: Callable which converts the reply into a model object
+        :param format_data: Format arguments of the URL part
+        """
+        return self._api.put(self.url(part, **format_data), data=data, headers=headers, parser=parser,
+                             service_path=self._get_path(), vin=self._get_vin(format_data), operation=part)
+
+    def _get_vin(self, format_data):
+        """
+        Returns the VIN errors of a request are reported for
+
+        :param format_data: Format arguments of the URL part
+        :return: VIN or None if the request isn't vehicle specific
+        :rtype: str
+        """
+        return format_data.get('vin')
 
     def _use_company(self):
         return True
@@ -53,7 +139,7 @@ class Service(metaclass=ABCMeta):
 
 
 class VehicleService(Service, metaclass=ABCMeta):
-    def __init__(self, api: API, vehicle: Vehicle):
+    def __init__(self, api: BaseAPI, vehicle: Vehicle):
         super().__init__(api)
         self._vehicle = vehicle
         """
@@ -62,8 +148,14 @@ class VehicleService(Service, metaclass=ABCMeta):
         :type _vehicle: Vehicle
         """
 
-    def url(self, part, **format_data):
-        return super().url(part, **format_data, vin=self._vehicle.vin)
+    def _url_template(self, part):
+        return super()._url_template(part).replace('{vin}', str(self._vehicle.vin))
+
+    def _url_key(self):
+        return super()._url_key() + (self._vehicle.vin,)
+
+    def _get_vin(self, format_data):
+        return self._vehicle.vin
 
 
 class AuthorizationService(Service):
@@ -80,18 +172,16 @@ class AuthorizationService(Service):
 
     def request_auth(self, vehicle: Vehicle, service: str, operation: str):
         headers = {'Content-Length': '0', 'Content-Type': 'application/json; charset=UTF-8'}
-        url = self.url('/vehicles/{vin}/services/{service}/operations/{operation}/request',
-                       vin=vehicle.vin, service=service, operation=operation)
-
         data = {}  # Yes send empty data - no idea why
-        return self._api.put(url, data=data, headers=headers)
+        return self._put('/vehicles/{vin}/services/{service}/operations/{operation}/request', data=data,
+                         headers=headers, vin=vehicle.vin, service=service, operation=operation)
 
     def complete_auth(self):
         """
         Completes the auth request
         """
         data = {}
-        return self._api.post(self.url('/complete'), data)
+        return self._post('/complete', data)
 
     def _get_path(self):
         return 'rolesrights/authorization/v1'
@@ -106,7 +196,7 @@ class CarFinderService(VehicleService):
         """
         Returns the position of the car
         """
-        return self._api.get(self.url('/vehicles/{vin}/position'))
+        return self._get('/vehicles/{vin}/position')
 
     def _get_path(self):
         return 'bs/cf/v1'
@@ -121,10 +211,7 @@ class CarService(Service):
         :rtype: VehiclesResponse
         """
 
-        data = self._api.get(self.url('/vehicles'))
-        response = VehiclesResponse()
-        response.parse(data)
-        return response
+        return self._get('/vehicles', parser=VehiclesResponse)
 
     def get_vehicle_data(self, vehicle: Vehicle):
         """
@@ -133,7 +220,7 @@ class CarService(Service):
         :param vehicle: Vehicle with CSID
         :return: Vehicle data
         """
-        return self._api.get(self.url('/vehicle/{csid}'.format(csid=vehicle.csid)))
+        return self._get('/vehicle/{csid}', csid=vehicle.csid)
 
     def _get_path(self):
         return 'myaudi/carservice/v2'
@@ -167,7 +254,7 @@ class LockUnlockService(VehicleService):
         """
         Returns all available actions
         """
-        return self._api.get(self.url("/vehicles/{vin}/actions"))
+        return self._get('/vehicles/{vin}/actions')
 
     # TODO: Lock and unlock request
 
@@ -187,11 +274,18 @@ class LogonService(Service):
         :param user: User
         :param password: Password
         :param persist_token: True if the token should be persisted in the file system after login
+        :return: Token
+        :rtype: Token
         """
-        token = self.__login_request(user, password)
-        self._api.use_token(token)
-        if persist_token:
-            token.persist()
+
+        def use_token(reply):
+            token = Token.parse(reply)
+            self._api.use_token(token)
+            if persist_token:
+                token.persist()
+            return token
+
+        return self.__login_request(user, password, use_token)
 
     def restore_token(self):
         """
@@ -206,20 +300,19 @@ class LogonService(Service):
         self._api.use_token(token)
         return True
 
-    def __login_request(self, user: str, password: str):
+    def __login_request(self, user: str, password: str, parser):
         """
         Requests a login token for the given user
 
         :param user: User
         :param password: Password
-        :return: Token
-        :rtype: Token
+        :param parser: Callable which receives the token reply
+        :return: Result of the parser
         """
         data = {'grant_type': 'password',
                 'username': user,
                 'password': password}
-        reply = self._api.post(self.url('/token'), data, use_json=False)
-        return Token.parse(reply)
+        return self._post('/token', data, use_json=False, parser=parser)
 
     def _get_path(self):
         return 'core/auth/v1'
@@ -245,7 +338,7 @@ class OperationListService(VehicleService):
         """
         Returns all services available and their license status
         """
-        return self._api.get(self.url('/vehicles/{vin}/operations'))
+        return self._get('/vehicles/{vin}/operations')
 
     def _get_path(self):
         return 'rolesrights/operationlist/v2'
@@ -254,7 +347,7 @@ class OperationListService(VehicleService):
 class PictureNavigationService(VehicleService):
     def get_all(self):
         # Returns 404 for some reason - might need to wireshark the correct path
-        return self._api.get(self.url('/vehicles/{vin}/all'))
+        return self._get('/vehicles/{vin}/all')
 
     def _get_path(self):
         return 'audi/b2c/picturenav/v1'
@@ -267,7 +360,7 @@ class PoiNavigationService(Service):
 
 class OnlineDestinationsService(VehicleService):
     def get_pois(self):
-        return self._api.get(self.url('/vehicles/{vin}/pois'))
+        return self._get('/vehicles/{vin}/pois')
 
     def _get_path(self):
         return ''  # TODO
@@ -279,13 +372,13 @@ class PreTripClimaService(VehicleService):
     """
 
     def get_status(self):
-        return self._api.get(self.url('/vehicles/{vin}/climater'))
+        return self._get('/vehicles/{vin}/climater')
 
     def get_request_status(self, action_id: str):
-        return self._api.get(self.url('/vehicles/{vin}/climater/actions/{action_id}', action_id=action_id))
+        return self._get('/vehicles/{vin}/climater/actions/{action_id}', action_id=action_id)
 
     def perform_action(self, request_factory: ClimaRequestFactory):
-        self._api.post(self.url('/vehicles/{vin}/climater/actions'), data=request_factory.build())
+        return self._post('/vehicles/{vin}/climater/actions', data=request_factory.build())
 
     def _get_path(self):
         return 'bs/climatisation/v1'
@@ -307,8 +400,8 @@ class PushNotificationService(Service):
         :param token: Google messaging service token
         :return:
         """
-        self._api.post(self.url('/subscriptions/{platform}/{app_id}/{token}', platform=platform, app_id=app_id,
-                                token=token), data={})
+        return self._post('/subscriptions/{platform}/{app_id}/{token}', data={}, platform=platform, app_id=app_id,
+                          token=token)
 
     def _get_path(self):
         return 'fns/subscription/v1'
@@ -327,10 +420,7 @@ class RemoteBatteryChargeService(VehicleService):
         :rtype: BatteryChargeResponse
         """
 
-        data = self._api.get(self.url('/vehicles/{vin}/charger'))
-        response = BatteryChargeResponse()
-        response.parse(data)
-        return response
+        return self._get('/vehicles/{vin}/charger', parser=BatteryChargeResponse)
 
     def _get_path(self):
         return 'bs/batterycharge/v1'
@@ -369,9 +459,7 @@ class RemoteHonkFlashService(VehicleService):
             'serviceDuration': seconds,
             'serviceOperationCode': self.FLASH_ONLY
         }}
-        data = self._api.post(self.url('/vehicles/{vin}/honkAndFlash'),
-                              data=data)
-        return HonkFlashAction(data)
+        return self._post('/vehicles/{vin}/honkAndFlash', data=data, parser=HonkFlashAction)
 
     def get_status(self, action: HonkFlashAction):
         """
@@ -381,8 +469,8 @@ class RemoteHonkFlashService(VehicleService):
         :return: RemoteHonkFlashActionStatus
         :rtype: RemoteHonkFlashActionStatus
         """
-        data = self._api.get(self.url('/vehicles/{vin}/honkAndFlash/{action_id}/status', action_id=action.id))
-        return RemoteHonkFlashActionStatus(data)
+        return self._get('/vehicles/{vin}/honkAndFlash/{action_id}/status', parser=RemoteHonkFlashActionStatus,
+                         action_id=action.id)
 
     def _get_path(self):
         return 'bs/rhf/v1'
@@ -399,7 +487,18 @@ class RemoteTripStatisticsService(VehicleService):
         """
         Returns the latest trip statistic
         """
-        return self._api.get(self.url('/vehicles/{vin}/tripdata/{trip_type}?newest', trip_type=trip_type))
+        return self._get('/vehicles/{vin}/tripdata/{trip_type}?newest', trip_type=trip_type)
+
+    def get_trips(self, trip_type: str):
+        """
+        Returns all trip statistics the backend keeps for the vehicle
+
+        :param trip_type: SHORT_TERM or LONG_TERM
+        :return: TripDataResponse
+        :rtype: TripDataResponse
+        """
+        return self._get('/vehicles/{vin}/tripdata/{trip_type}?type=list', parser=TripDataResponse,
+                         trip_type=trip_type)
 
     def _get_path(self):
         return 'bs/tripstatistics/v1'
@@ -411,7 +510,7 @@ class SpeedAlertService(VehicleService):
     """
 
     def get_list(self):
-        return self._api.get(self.url('/vehicles/{vin}/speedAlerts'))
+        return self._get('/vehicles/{vin}/speedAlerts')
 
     def _get_path(self):
         return 'bs/speedalert/v1'
@@ -423,7 +522,7 @@ class UserInfoService(Service):
     """
 
     def get_info(self):
-        return self._api.get(self.url('/userInfo'))
+        return self._get('/userInfo')
 
     def _get_path(self):
         return 'core/auth/v1'
@@ -435,7 +534,7 @@ class UserManagementService(VehicleService):
     """
 
     def get_paring_status(self):
-        return self._api.get(self.url('/vehicles/{vin}/pairing'))
+        return self._get('/vehicles/{vin}/pairing')
 
     def _get_path(self):
         return 'usermanagement/users/v1'
@@ -447,17 +546,17 @@ class ValetAlertService(Service):
     """
 
     def get_alerts(self):
-        return self._api.get(self.url('/vehicles/{vin}/valetAlerts'))
+        return self._get('/vehicles/{vin}/valetAlerts')
 
     def get_definition(self):
-        return self._api.get(self.url('/vehicles/{vin}/valetAlertDefinition'))
+        return self._get('/vehicles/{vin}/valetAlertDefinition')
 
     def get_request_status(self, request_id: str):
-        return self._api.get(self.url('/vehicles/{vin}/valetAlertDefinition/{id}/status', id=request_id))
+        return self._get('/vehicles/{vin}/valetAlertDefinition/{id}/status', id=request_id)
 
     def set_definition(self, definition):
         # TODO: Implement definition
-        return self._api.post(self.url('/vehicles/{vin}/valetAlertDefinition', data={}))
+        return self._post('/vehicles/{vin}/valetAlertDefinition', data={})
 
     def _get_path(self):
         return 'bs/valetalert/v1'
@@ -473,7 +572,7 @@ class VehicleManagementService(VehicleService):
         Returns information about the connection system of the vehicle
         (such as embedded sim)
         """
-        return self._api.get(self.url('/vehicles/{vin}'))
+        return self._get('/vehicles/{vin}')
 
     def _get_path(self):
         return 'vehicleMgmt/vehicledata/v2'
@@ -492,19 +591,20 @@ class VehicleStatusReportService(VehicleService):
         :return: RequestStatus
         :rtype: RequestStatus
         """
-        data = self._api.get(self.url('/vehicles/{vin}/requests/{request_id}/jobstatus', request_id=request_id))
-        return RequestStatus(data)
+        return self._get('/vehicles/{vin}/requests/{request_id}/jobstatus', parser=RequestStatus,
+                         request_id=request_id)
 
-    def get_requested_current_vehicle_data(self, request_id: str):
+    def get_requested_current_vehicle_data(self, request_id: str, mode: str = VehicleDataResponse.EAGER):
         """
         Returns the vehicle report of the request with the given ID
 
         :param request_id: Request ID
+        :param mode: How the fields are stored, see VehicleDataResponse
         :return: VehicleDataResponse
         :rtype: VehicleDataResponse
         """
-        data = self._api.get(self.url('/vehicles/{vin}/requests/{request_id}/status', request_id=request_id))
-        return VehicleDataResponse(data)
+        return self._get('/vehicles/{vin}/requests/{request_id}/status', parser=self.__parser(mode),
+                         request_id=request_id)
 
     def request_current_vehicle_data(self):
         """
@@ -513,18 +613,35 @@ class VehicleStatusReportService(VehicleService):
         :return: CurrentVehicleDataResponse
         :rtype: CurrentVehicleDataResponse
         """
-        data = self._api.post(self.url('/vehicles/{vin}/requests'))
-        return CurrentVehicleDataResponse(data)
+        return self._post('/vehicles/{vin}/requests', parser=CurrentVehicleDataResponse)
 
-    def get_stored_vehicle_data(self):
+    def get_stored_vehicle_data(self, mode: str = VehicleDataResponse.EAGER):
         """
         Returns the last vehicle data received
 
+        :param mode: How the fields are stored, see VehicleDataResponse
         :return: VehicleDataResponse
         :rtype: VehicleDataResponse
         """
-        data = self._api.get(self.url('/vehicles/{vin}/status'))
-        return VehicleDataResponse(data)
+        return self._get('/vehicles/{vin}/status', parser=self.__parser(mode))
+
+    @staticmethod
+    def __parser(mode: str):
+        parser = _VEHICLE_DATA_PARSERS.get(mode)
+        if parser is None:
+            parser = functools.partial(VehicleDataResponse, mode=mode)
+        return parser
 
     def _get_path(self):
         return 'bs/vsr/v1'
+
+
+_VEHICLE_DATA_PARSERS = {VehicleDataResponse.EAGER: VehicleDataResponse,
+                         VehicleDataResponse.COLUMNAR: functools.partial(VehicleDataResponse,
+                                                                         mode=VehicleDataResponse.COLUMNAR),
+                         VehicleDataResponse.LAZY: functools.partial(VehicleDataResponse,
+                                                                     mode=VehicleDataResponse.LAZY)}
+"""
+One parser per mode. The parser is part of the cache and conditional request keys,
+so it has to be the same object for every request
+"""
@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from audiapi.ChangeTracker import ChangeTracker
+from audiapi.Exceptions import PermissionDeniedError, NotFoundError
+from audiapi.Services import VehicleStatusReportService, RemoteBatteryChargeService
+from audiapi.model.Vehicle import Vehicle
+from audiapi.model.VehicleDataResponse import VehicleDataResponse
+
+
+class VehicleUpdate:
+    """
+    Result of a single poll of a vehicle
+    """
+
+    def __init__(self, vehicle: Vehicle, delta=None, battery=None, error: Exception = None):
+        self.vehicle = vehicle
+        self.delta = delta
+        """
+        Changed fields since the last poll
+
+        :type delta: audiapi.ChangeTracker.VehicleDataDelta
+        """
+        self.battery = battery
+        """
+        Battery status if it is polled
+
+        :type battery: audiapi.model.BatteryChargeResponse.BatteryChargeResponse
+        """
+        self.error = error
+
+    def __str__(self):
+        if self.error is not None:
+            return self.vehicle.vin + ': error ' + str(self.error)
+        return str(self.delta)
+
+
+class _VehicleState:
+    __slots__ = ('vehicle', 'interval', 'battery')
+
+    def __init__(self, vehicle: Vehicle, interval: float, battery: bool):
+        self.vehicle = vehicle
+        self.interval = interval
+        self.battery = battery
+
+
+class FleetStream:
+    """
+    Polls a fleet forever and yields the changes of each vehicle.
+
+    Vehicles whose data changed or which are charging are polled every min_interval seconds.
+    The interval of vehicles without changes grows by the backoff factor up to max_interval,
+    so parked cars cost few requests. Only the watched fields of the last snapshot are kept
+    per vehicle and at most one poll per worker is in flight, so memory only grows with
+    the number of vehicles
+    """
+
+    def __init__(self, fleet, vehicles, fields=None, min_interval: float = 60, max_interval: float = 1800,
+                 backoff: float = 2.0, battery: bool = False, changes_only: bool = True):
+        """
+        :param fleet: Fleet which runs the polls
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs
+        :param fields: Names or IDs of the fields to watch, None for all
+        :param min_interval: Poll interval in seconds of active vehicles
+        :param max_interval: Poll interval in seconds of idle vehicles
+        :param backoff: Factor by which the interval of idle vehicles grows
+        :param battery: True to poll the battery status as well, vehicles without one are skipped automatically
+        :param changes_only: True to only yield polls with changes or errors
+        """
+        self.__fleet = fleet
+        self.__vehicles = list(fleet.to_vehicles(vehicles))
+        self.__tracker = ChangeTracker(fields)
+        self.__mode = VehicleDataResponse.EAGER if fields is None else VehicleDataResponse.LAZY
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__backoff = backoff
+        self.__battery = battery
+        self.__changes_only = changes_only
+
+    def __iter__(self):
+        queue = []
+        counter = itertools.count()
+        now = time.monotonic()
+        # Spread the first polls over one interval instead of sending them all at once
+        step = self.__min_interval / max(len(self.__vehicles), 1)
+        for index, vehicle in enumerate(self.__vehicles):
+            state = _VehicleState(vehicle, self.__min_interval, self.__battery)
+            heapq.heappush(queue, (now + index * step, next(counter), state))
+
+        in_flight = {}
+        max_in_flight = self.__fleet.max_workers
+        while queue or in_flight:
+            now = time.monotonic()
+            while queue and queue[0][0] <= now and len(in_flight) < max_in_flight:
+                state = heapq.heappop(queue)[2]
+                in_flight[self.__fleet.submit(state.vehicle, self.__poll_operation(state))] = state
+
+            timeout = None
+            if queue and len(in_flight) < max_in_flight:
+                timeout = max(queue[0][0] - time.monotonic(), 0)
+            if not in_flight:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                state = in_flight.pop(future)
+                update = self.__handle(state, future.result())
+                heapq.heappush(queue, (time.monotonic() + state.interval, next(counter), state))
+                if update is not None:
+                    yield update
+
+    def __poll_operation(self, state: _VehicleState):
+        mode = self.__mode
+        tracker = self.__tracker
+        poll_battery = state.battery
+
+        def poll(api, vehicle: Vehicle):
+            response = VehicleStatusReportService(api, vehicle).get_stored_vehicle_data(mode)
+            battery = None
+            if poll_battery:
+                try:
+                    battery = RemoteBatteryChargeService(api, vehicle).get_status()
+                except (PermissionDeniedError, NotFoundError):
+                    # No EV or no charger service - stop asking for this vehicle
+                    state.battery = False
+                except Exception:
+                    # Temporary failure (server error, rate limit, timeout, open circuit), ask again next time
+                    pass
+            return VehicleUpdate(vehicle, tracker.update(vehicle.vin, response), battery)
+
+        return poll
+
+    def __handle(self, state: _VehicleState, result):
+        if not result.ok:
+            state.interval = min(state.interval * self.__backoff, self.__max_interval)
+            return VehicleUpdate(state.vehicle, error=result.error)
+
+        update = result.result
+        active = bool(update.delta) or (update.battery is not None and update.battery.charging)
+        if active:
+            state.interval = self.__min_interval
+        else:
+            state.interval = min(state.interval * self.__backoff, self.__max_interval)
+        if self.__changes_only and not update.delta:
+            return None
+        return update
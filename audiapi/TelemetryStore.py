@@ -0,0 +1,334 @@
+import bisect
+import mmap
+import os
+import threading
+from array import array
+from datetime import datetime, timezone
+
+from audiapi.model.VehicleDataResponse import VehicleDataResponse, Field, NAME_IDS, parse_timestamp
+
+
+class Series:
+    """
+    Samples of one field of one vehicle, ordered by time.
+
+    times (milliseconds since the epoch) and values are memoryviews on the memory-mapped
+    files, so nothing is copied. They can be wrapped without copying as well, e.g. with
+    numpy.frombuffer(series.values, dtype='float64'). The views stay valid until the store is closed
+    """
+    __slots__ = ('vin', 'field_id', 'times', 'values')
+
+    def __init__(self, vin: str, field_id: str, times: memoryview, values: memoryview):
+        self.vin = vin
+        self.field_id = field_id
+        self.times = times
+        self.values = values
+
+    @property
+    def name(self):
+        return Field.IDS.get(self.field_id)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        """
+        :return: Generator of (timestamp in ms, value)
+        """
+        return zip(self.times, self.values)
+
+    def last(self):
+        """
+        :return: Latest (timestamp in ms, value) or None if the series is empty
+        """
+        if len(self.times) == 0:
+            return None
+        return self.times[-1], self.values[-1]
+
+    def __str__(self):
+        return self.vin + ' ' + str(self.name) + ': ' + str(len(self)) + ' samples'
+
+
+class _Segment:
+    """
+    Memory map of one column file
+    """
+
+    def __init__(self, path: str, typecode: str):
+        self.size = os.path.getsize(path)
+        self.view = memoryview(b'').cast(typecode)
+        self.map = None
+        # A torn write can leave a partial item at the end, only whole items are mapped
+        whole = self.size - self.size % self.view.itemsize
+        if whole > 0:
+            with open(path, 'rb') as column:
+                self.map = mmap.mmap(column.fileno(), 0, access=mmap.ACCESS_READ)
+            with memoryview(self.map) as raw:
+                self.view = raw[:whole].cast(typecode)
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # Still referenced by a Series, closed once that is collected
+                pass
+
+
+class TelemetryStore:
+    """
+    Archives the numeric fields of vehicle data responses on disk.
+
+    Every field of every vehicle is an append-only series stored in two column files,
+    root/VIN/FIELD_ID.t with the measure times (int64 milliseconds since the epoch) and
+    root/VIN/FIELD_ID.v with the values (float64), both in native byte order.
+    Range queries memory-map the files and binary search the time column:
+
+        with TelemetryStore('telemetry') as store:
+            store.append(vin, response)
+            ...
+            store.flush()
+            for series in store.query(vins, 'STATE_OF_CHARGE', start=datetime(2019, 3, 1)).values():
+                print(series.vin, list(series))
+
+    Samples are buffered in memory until flush is called (or flush_every samples are buffered).
+    Samples which are not newer than the latest one of their series are skipped,
+    so polling the same unchanged data again doesn't grow the files
+    """
+    TIMES = '.t'
+    VALUES = '.v'
+
+    def __init__(self, root: str, fields=None, flush_every: int = 100000):
+        """
+        :param root: Directory of the store, created if it doesn't exist
+        :param fields: Names or IDs of the fields to store, None for all known numeric fields
+        :param flush_every: Number of buffered samples after which they are written automatically
+        """
+        self.__root = root
+        self.__fields = None
+        if fields is not None:
+            self.__fields = {self.field_id(field) for field in fields}
+        self.__flush_every = flush_every
+        self.__buffers = {}
+        self.__buffered = 0
+        self.__latest = {}
+        self.__segments = {}
+        self.__lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Writes all buffered samples and unmaps all files
+        """
+        self.flush()
+        with self.__lock:
+            for times, values in self.__segments.values():
+                times.close()
+                values.close()
+            self.__segments.clear()
+
+    @staticmethod
+    def field_id(field):
+        """
+        :param field: Name or ID of a known field
+        :return: ID as written in Field.IDS
+        :rtype: str
+        """
+        decoder = Field.decoder_for(field)
+        if decoder is not None:
+            return NAME_IDS[decoder.name]
+        if field in NAME_IDS:
+            return NAME_IDS[field]
+        raise KeyError('Unknown field ' + str(field))
+
+    def append(self, vin: str, response: VehicleDataResponse):
+        """
+        Adds the numeric fields of the response
+
+        :param vin: VIN of the vehicle
+        :param response: Vehicle data
+        :return: Number of added samples
+        :rtype: int
+        """
+        added = 0
+        for field in response.data_fields:
+            decoder = Field.decoder_for(field.id)
+            if decoder is None or decoder.convert is None:
+                continue
+            field_id = NAME_IDS[decoder.name]
+            if self.__fields is not None and field_id not in self.__fields:
+                continue
+            value = decoder.decode(field.value)
+            timestamp = parse_timestamp(field.measure_time) or parse_timestamp(field.send_time)
+            if timestamp is None or not isinstance(value, (int, float)):
+                continue
+            if self.add(vin, field_id, timestamp, value):
+                added += 1
+        return added
+
+    def add(self, vin: str, field, timestamp, value: float):
+        """
+        Adds a single sample
+
+        :param vin: VIN of the vehicle
+        :param field: Name or ID of the field
+        :param timestamp: Measure time as datetime or milliseconds since the epoch
+        :param value: Value
+        :return: False if the sample was skipped since it isn't newer than the latest one
+        :rtype: bool
+        """
+        key = (vin, self.field_id(field))
+        millis = self.to_millis(timestamp)
+        flush = False
+        with self.__lock:
+            latest = self.__latest.get(key)
+            if latest is None:
+                latest = self.__read_latest(key)
+            if latest is not None and millis <= latest:
+                return False
+            self.__latest[key] = millis
+            buffer = self.__buffers.get(key)
+            if buffer is None:
+                buffer = (array('q'), array('d'))
+                self.__buffers[key] = buffer
+            buffer[0].append(millis)
+            buffer[1].append(value)
+            self.__buffered += 1
+            flush = self.__buffered >= self.__flush_every
+        if flush:
+            self.flush()
+        return True
+
+    def flush(self):
+        """
+        Writes all buffered samples to disk
+        """
+        with self.__lock:
+            buffers = self.__buffers
+            self.__buffers = {}
+            self.__buffered = 0
+            for (vin, field_id), (times, values) in buffers.items():
+                base = self.__path(vin, field_id)
+                os.makedirs(os.path.dirname(base), exist_ok=True)
+                # Values are written first. If a flush was interrupted before, one column holds more
+                # samples than the other or ends with a partial item. Both are cut back to the
+                # samples they have in common
+                sizes = [os.path.getsize(base + suffix) if os.path.isfile(base + suffix) else 0
+                         for suffix in (self.TIMES, self.VALUES)]
+                complete = min(sizes) - min(sizes) % 8
+                with open(base + self.VALUES, 'ab') as values_column, \
+                        open(base + self.TIMES, 'ab') as times_column:
+                    for column, size in ((times_column, sizes[0]), (values_column, sizes[1])):
+                        if size != complete:
+                            column.truncate(complete)
+                            column.seek(complete)
+                    values.tofile(values_column)
+                    values_column.flush()
+                    times.tofile(times_column)
+
+    def series(self, vin: str, field, start=None, end=None):
+        """
+        Returns the samples of one field of one vehicle within the time range.
+        Only written samples are returned, see flush
+
+        :param vin: VIN of the vehicle
+        :param field: Name or ID of the field
+        :param start: Start of the range (inclusive) as datetime or milliseconds, None for no limit
+        :param end: End of the range (exclusive) as datetime or milliseconds, None for no limit
+        :rtype: Series
+        """
+        field_id = self.field_id(field)
+        times, values = self.__map(vin, field_id)
+        count = min(len(times), len(values))
+        low = 0
+        high = count
+        if start is not None:
+            low = bisect.bisect_left(times, self.to_millis(start), 0, count)
+        if end is not None:
+            high = bisect.bisect_left(times, self.to_millis(end), low, count)
+        return Series(vin, field_id, times[low:high], values[low:high])
+
+    def query(self, vins, field, start=None, end=None):
+        """
+        Returns the samples of one field for many vehicles, see series
+
+        :param vins: VINs of the vehicles
+        :return: Series by VIN
+        :rtype: dict[str, Series]
+        """
+        return {vin: self.series(vin, field, start, end) for vin in vins}
+
+    def vins(self):
+        """
+        :return: VINs of all vehicles with samples on disk
+        :rtype: list[str]
+        """
+        return sorted(entry.name for entry in os.scandir(self.__root) if entry.is_dir())
+
+    def fields(self, vin: str):
+        """
+        :return: IDs of all fields of the vehicle with samples on disk
+        :rtype: list[str]
+        """
+        directory = os.path.join(self.__root, vin)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(self.TIMES)] for name in os.listdir(directory) if name.endswith(self.TIMES))
+
+    @staticmethod
+    def to_millis(timestamp):
+        """
+        :param timestamp: datetime (naive ones are taken as UTC) or milliseconds since the epoch
+        :rtype: int
+        """
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            return int(timestamp.timestamp() * 1000)
+        return int(timestamp)
+
+    def __path(self, vin: str, field_id: str):
+        return os.path.join(self.__root, vin, field_id)
+
+    def __map(self, vin: str, field_id: str):
+        """
+        :return: Memoryviews of the time and value column, remapped if the files grew
+        """
+        base = self.__path(vin, field_id)
+        try:
+            size = os.path.getsize(base + self.TIMES)
+        except FileNotFoundError:
+            return memoryview(b'').cast('q'), memoryview(b'').cast('d')
+        key = (vin, field_id)
+        with self.__lock:
+            segments = self.__segments.get(key)
+            if segments is None or segments[0].size != size:
+                if segments is not None:
+                    segments[0].close()
+                    segments[1].close()
+                segments = (_Segment(base + self.TIMES, 'q'), _Segment(base + self.VALUES, 'd'))
+                self.__segments[key] = segments
+            return segments[0].view, segments[1].view
+
+    def __read_latest(self, key):
+        """
+        :return: Latest time of the series on disk or None
+        """
+        path = self.__path(*key) + self.TIMES
+        if not os.path.isfile(path):
+            return None
+        size = os.path.getsize(path)
+        if size < 8:
+            return None
+        with open(path, 'rb') as column:
+            column.seek(size - size % 8 - 8)
+            latest = array('q')
+            latest.frombytes(column.read(8))
+        return latest[0]
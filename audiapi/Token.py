@@ -12,14 +12,15 @@ class Token:
         self.token_type = ''
         self.expires_in = 0
 
-    def valid(self):
+    def valid(self, margin: int = 0):
         """
         Checks if this token is still valid
 
+        :param margin: Seconds the token has to be valid for at least
         :return: True if valid
         :rtype: bool
         """
-        return self.expires_in > int(time.time())
+        return self.expires_in > int(time.time()) + margin
 
     def persist(self):
         with open(self.FILE, 'w') as outfile:
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from audiapi.Services import LogonService
+from audiapi.Token import Token
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileTokenStore:
+    """
+    Token file which is shared between processes.
+    Access is serialized with a lock file
+    """
+
+    def __init__(self, path: str = Token.FILE):
+        """
+        :param path: Path of the token file
+        """
+        self.__path = path
+        self.__lock_path = path + '.lock'
+
+    @contextmanager
+    def lock(self):
+        """
+        Holds the inter-process lock while the context is active
+        """
+        with open(self.__lock_path, 'a+') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def load(self):
+        """
+        :return: Stored token or None
+        :rtype: Token
+        """
+        if not os.path.isfile(self.__path):
+            return None
+        try:
+            with open(self.__path) as data_file:
+                return Token.parse(json.load(data_file), relative_timestamp=False)
+        except (ValueError, TypeError):
+            return None
+
+    def save(self, token: Token):
+        # Replace the file atomically so readers without the lock never see a partial token
+        tmp_path = self.__path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'w') as outfile:
+            json.dump(token.__dict__, outfile)
+        os.replace(tmp_path, self.__path)
+
+
+class TokenManager:
+    """
+    Keeps the API logged in.
+
+    The token is renewed once it expires within the safety margin. Concurrent callers
+    wait for a single login instead of logging in themselves. With a FileTokenStore,
+    processes share the token and only one of them logs in per expiry. If the backend rejects
+    the token before it expires, the API logs in again and sends the request once more.
+
+        manager = TokenManager(api, user, password, store=FileTokenStore())
+        api.use_token_manager(manager)
+
+    Only works with the blocking API.
+    """
+
+    def __init__(self, api, user: str, password: str, store: FileTokenStore = None, margin: int = 300):
+        """
+        :param api: API used for the login
+        :param user: User
+        :param password: Password
+        :param store: Store shared with other processes or None to keep the token in memory only
+        :param margin: Seconds before the expiry at which the token is renewed
+        """
+        self.__logon_service = LogonService(api)
+        self.__user = user
+        self.__password = password
+        self.__store = store
+        self.__margin = margin
+        self.__token = None
+        self.__rejected = None
+        """
+        Access token which was invalidated, it is never taken from the store again
+        """
+        self.__lock = threading.Lock()
+        self.__refreshing_thread = None
+        self.logins = 0
+        """
+        Number of logins done by this manager
+        """
+
+    def token(self):
+        """
+        Returns a token which is valid for at least the safety margin, renews it if required
+
+        :rtype: Token
+        """
+        token = self.__token
+        if token is not None and token.valid(self.__margin):
+            return token
+        if self.__refreshing_thread == threading.get_ident():
+            # Called for the login request itself
+            return token
+
+        with self.__lock:
+            # Another thread might have renewed it while we waited
+            token = self.__token
+            if token is not None and token.valid(self.__margin):
+                return token
+            self.__refreshing_thread = threading.get_ident()
+            try:
+                self.__token = self.__renew()
+            finally:
+                self.__refreshing_thread = None
+            return self.__token
+
+    def invalidate(self, access_token: str = None):
+        """
+        Forces a renewal on the next request, e.g. after the backend rejected the token.
+        The API calls it itself if a request fails with an AuthError
+
+        :param access_token: Rejected access token, the current token is kept if it is another one
+        (e.g. it was renewed by another thread in the meantime). None to drop the current token
+        :return: True if the next request is sent with another token, False if the login itself was rejected
+        :rtype: bool
+        """
+        if self.__refreshing_thread == threading.get_ident():
+            # Raised by the login request, logging in again wouldn't help
+            return False
+        with self.__lock:
+            if self.__token is not None and (access_token is None or self.__token.access_token == access_token):
+                self.__rejected = self.__token.access_token
+                self.__token = None
+        return True
+
+    def __renew(self):
+        if self.__store is None:
+            return self.__login()
+
+        with self.__store.lock():
+            token = self.__store.load()
+            if token is not None and token.valid(self.__margin) and token.access_token != self.__rejected and \
+                    (self.__token is None or token.access_token != self.__token.access_token):
+                # Another process already renewed it
+                return token
+            token = self.__login()
+            self.__store.save(token)
+            return token
+
+    def __login(self):
+        self.logins += 1
+        return self.__logon_service.login(self.__user, self.__password, persist_token=False)
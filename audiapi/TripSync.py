@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+
+from audiapi.API import API
+from audiapi.Fleet import Fleet
+from audiapi.Services import RemoteTripStatisticsService
+from audiapi.model.Vehicle import Vehicle
+
+
+class TripSyncState:
+    """
+    ID of the newest synced trip per vehicle and trip type, optionally kept in a JSON file
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: Path of the JSON file, None to keep the state in memory only
+        """
+        self.__path = path
+        self.__marks = {}
+        self.__lock = threading.Lock()
+        if path is not None and os.path.isfile(path):
+            with open(path) as data_file:
+                self.__marks = json.load(data_file)
+
+    def get(self, vin: str, trip_type: str):
+        """
+        :return: ID of the newest synced trip or None if nothing was synced yet
+        """
+        with self.__lock:
+            return self.__marks.get(vin, {}).get(trip_type)
+
+    def advance(self, vin: str, trip_type: str, trip_id):
+        """
+        Remembers the trip as synced, older IDs are ignored
+
+        :param vin: VIN of the vehicle
+        :param trip_type: Trip type, see RemoteTripStatisticsService
+        :param trip_id: ID of the newest synced trip
+        """
+        if trip_id is None:
+            return
+        with self.__lock:
+            marks = self.__marks.setdefault(vin, {})
+            latest = marks.get(trip_type)
+            if latest is None or trip_id > latest:
+                marks[trip_type] = trip_id
+
+    def save(self):
+        """
+        Writes the state to its file
+        """
+        if self.__path is None:
+            return
+        with self.__lock:
+            # Replace the file atomically so an interrupted save keeps the previous state
+            tmp_path = self.__path + '.' + str(os.getpid()) + '.tmp'
+            with open(tmp_path, 'w') as outfile:
+                json.dump(self.__marks, outfile)
+            os.replace(tmp_path, self.__path)
+
+
+class TripSync:
+    """
+    Fetches the trips which were added since the last sync, for many vehicles in parallel
+
+        sync = TripSync(fleet, TripSyncState('trips.json'))
+        for result in sync.run(vehicles):
+            if result.ok:
+                for trip_type, trips in result.result.items():
+                    report(result.vehicle.vin, trip_type, trips)
+
+    The backend has no paging, so the trip list of every vehicle is fetched once per run and
+    only the trips newer than the stored high-water mark are returned. The marks of a
+    vehicle are only advanced once all of its trip types were fetched successfully,
+    failed vehicles are fetched in full again by the next run
+    """
+
+    def __init__(self, fleet: Fleet, state: TripSyncState = None, trip_types=None):
+        """
+        :param fleet: Fleet which runs the requests
+        :param state: High-water marks, None to keep them in memory
+        :param trip_types: Trip types to sync, None for short and long term trips
+        """
+        if state is None:
+            state = TripSyncState()
+        if trip_types is None:
+            trip_types = (RemoteTripStatisticsService.SHORT_TERM, RemoteTripStatisticsService.LONG_TERM)
+        self.__fleet = fleet
+        self.state = state
+        self.__trip_types = tuple(trip_types)
+
+    def run(self, vehicles):
+        """
+        Syncs all given vehicles. The state is saved once all of them are done
+
+        :param vehicles: VehiclesResponse or list of Vehicle objects or VINs
+        :return: Generator of FleetResult whose result is a dict of the new trips (oldest first) by trip type
+        """
+        try:
+            for result in self.__fleet.run(vehicles, self.fetch):
+                if result.ok:
+                    for trip_type, trips in result.result.items():
+                        if trips:
+                            self.state.advance(result.vehicle.vin, trip_type, trips[-1].id)
+                yield result
+        finally:
+            self.state.save()
+
+    def run_all(self, vehicles):
+        """
+        Syncs all given vehicles and waits for all of them
+
+        :rtype: list[audiapi.Fleet.FleetResult]
+        """
+        return list(self.run(vehicles))
+
+    def fetch(self, api: API, vehicle: Vehicle):
+        """
+        Fleet operation which fetches the trips of a single vehicle that are newer than its marks.
+        The marks are not advanced
+
+        :return: New trips by trip type
+        :rtype: dict[str, list[audiapi.model.TripData.TripData]]
+        """
+        service = RemoteTripStatisticsService(api, vehicle)
+        trips = {}
+        for trip_type in self.__trip_types:
+            trips[trip_type] = service.get_trips(trip_type).since(self.state.get(vehicle.vin, trip_type))
+        return trips
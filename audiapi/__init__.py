@@ -0,0 +1,66 @@
+"""
+Audi connect API.
+
+Importing the package is cheap: services, models and helpers are only imported on first access,
+e.g. audiapi.RemoteBatteryChargeService only loads the services and the models they parse.
+Modules can be imported as before (from audiapi.Services import CarService). Names which are
+modules as well (API, Fleet, Client, ...) refer to the module
+"""
+import importlib
+
+_EXPORTS = {
+    'audiapi.Services': ('Service', 'VehicleService', 'AuthorizationService', 'CarFinderService', 'CarService',
+                         'ClimateService', 'DiebstahlwarnanlageService', 'GeofenceService', 'LockUnlockService',
+                         'LogonService', 'MobileKeyService', 'OperationListService', 'PictureNavigationService',
+                         'PoiNavigationService', 'OnlineDestinationsService', 'PreTripClimaService',
+                         'PushNotificationService', 'RemoteBatteryChargeService', 'RemoteDepartureTimeService',
+                         'RemoteHonkFlashService', 'RemoteTripStatisticsService', 'SpeedAlertService',
+                         'UserInfoService', 'UserManagementService', 'ValetAlertService', 'VehicleManagementService',
+                         'VehicleStatusReportService'),
+    'audiapi.Exceptions': ('AudiAPIError', 'AuthError', 'TokenExpiredError', 'PermissionDeniedError',
+                           'NotFoundError', 'RateLimitError', 'ServerError', 'TransportError',
+                           'InvalidResponseError'),
+    'audiapi.Retry': ('CircuitOpenError', 'CircuitBreaker', 'RetryPolicy'),
+    'audiapi.RateLimit': ('TokenBucket', 'RateLimiter'),
+    'audiapi.Cache': ('ResponseCache',),
+    'audiapi.Conditional': ('ConditionalRequests',),
+    'audiapi.Instrumentation': ('RequestMetrics', 'MetricsRecorder'),
+    'audiapi.Fleet': ('FleetOperation', 'FleetResult'),
+    'audiapi.TokenManager': ('FileTokenStore',),
+    'audiapi.Client': ('VehicleClient',),
+    'audiapi.TripSync': ('TripSyncState',),
+    'audiapi.JobPoller': ('JobFailedError',),
+    'audiapi.model.BatteryChargeResponse': ('BatteryChargeResponse',),
+    'audiapi.model.ClimaRequest': ('StartClimaRequestFactory', 'StopClimaRequestFactory', 'ClimaActionStatus'),
+    'audiapi.model.CurrentVehicleDataResponse': ('CurrentVehicleDataResponse',),
+    'audiapi.model.RequestStatus': ('RequestStatus',),
+    'audiapi.model.TripData': ('TripData', 'TripDataResponse'),
+    'audiapi.model.Vehicle': ('Vehicle', 'VehiclesResponse'),
+    'audiapi.model.VehicleDataResponse': ('VehicleDataResponse', 'DoorState', 'Field'),
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+"""
+Module of every lazily exported name
+"""
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module), name)
+        # Later lookups find the name directly and don't end up here
+        globals()[name] = value
+        return value
+    try:
+        return importlib.import_module(__name__ + '.' + name)
+    except ModuleNotFoundError as e:
+        if e.name != __name__ + '.' + name:
+            raise
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
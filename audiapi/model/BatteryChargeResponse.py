@@ -3,8 +3,30 @@ class BatteryChargeResponse:
     Represents a battery charge response
     """
 
+    def __init__(self, data=None):
+        """
+        :param data: Optional charger response which is parsed right away
+        """
+        self.charger = None
+        if data is not None:
+            self.parse(data)
+
     def parse(self, data):
         self.charger = data.get('charger')
 
+    @property
+    def charging_state(self):
+        """
+        Charging state as reported by the car (e.g. charging, off) or None if unknown
+        """
+        try:
+            return self.charger['status']['chargingStatusData']['chargingState']['content']
+        except (KeyError, TypeError):
+            return None
+
+    @property
+    def charging(self):
+        return self.charging_state == 'charging'
+
     def __str__(self):
         return str(self.__dict__)
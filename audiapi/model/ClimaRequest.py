@@ -33,3 +33,20 @@ class StopClimaRequestFactory(ClimaRequestFactory):
                 'type': 'stopClimatisation'
             }
         }
+
+
+class ClimaActionStatus:
+    """
+    State of a clima action as returned by PreTripClimaService.get_request_status
+    """
+    QUEUED = 'queued'
+    FETCHED = 'fetched'
+    DELAYED = 'delayed'
+    SUCCESS = 'succeeded'
+    FAIL = 'failed'
+
+    def __init__(self, data):
+        action = data.get('action')
+        self.id = action.get('actionId')
+        self.state = action.get('actionState')
+        self.error_code = action.get('errorCode')
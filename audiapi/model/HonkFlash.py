@@ -9,6 +9,10 @@ class HonkFlashAction:
 
 
 class RemoteHonkFlashActionStatus:
+    IN_PROGRESS = 'REQUEST_IN_PROGRESS'
+    SUCCESS = 'REQUEST_SUCCESSFUL'
+    FAIL = 'REQUEST_FAILED'
+
     def __init__(self, data):
         request = data.get('status')
         self.status = request.get('statusCode')
@@ -5,5 +5,17 @@ class RequestStatus:
 
     def __init__(self, data):
         data = data['requestStatusResponse']
-        self.status = data['status']
-        self.vin = data['vin']
+        self.__assign(data['status'], data['vin'])
+
+    @classmethod
+    def from_values(cls, status, vin):
+        """
+        Creates a request status from already decoded values instead of a raw reply
+        """
+        request_status = cls.__new__(cls)
+        request_status.__assign(status, vin)
+        return request_status
+
+    def __assign(self, status, vin):
+        self.status = status
+        self.vin = vin
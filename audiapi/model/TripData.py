@@ -0,0 +1,106 @@
+from audiapi.model.VehicleDataResponse import parse_timestamp
+
+
+class TripData:
+    """
+    Statistics of a single trip (short term) or of the time since the last reset (long term).
+    Consumptions are per 100 km, distances in km and times in minutes
+    """
+    __slots__ = ('id', 'trip_type', 'timestamp', 'mileage', 'start_mileage', 'overall_mileage', 'travel_time',
+                 'average_speed', 'average_fuel_consumption', 'average_electric_consumption', 'report_reason')
+
+    def __init__(self, data):
+        """
+        :param data: Single tripData entry
+        """
+        self.id = data.get('tripID')
+        self.trip_type = data.get('tripType')
+        self.timestamp = data.get('timestamp')
+        """
+        End of the trip as sent by the backend, see time
+        """
+        self.mileage = data.get('mileage')
+        self.start_mileage = data.get('startMileage')
+        self.overall_mileage = data.get('overallMileage')
+        self.travel_time = data.get('traveltime')
+        self.average_speed = data.get('averageSpeed')
+        self.average_fuel_consumption = data.get('averageFuelConsumption')
+        self.average_electric_consumption = data.get('averageElectricEngineConsumption')
+        self.report_reason = data.get('reportReason')
+
+    @property
+    def time(self):
+        """
+        :return: End of the trip or None if unknown
+        :rtype: datetime.datetime
+        """
+        return parse_timestamp(self.timestamp)
+
+    def to_dict(self):
+        """
+        :return: Fields by name, e.g. for writing the trip to JSON or CSV
+        :rtype: dict
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self):
+        return str(self.to_dict())
+
+
+class TripDataResponse:
+    """
+    Trips of one vehicle, either the newest one or the whole list
+    """
+
+    def __init__(self, data=None):
+        """
+        :param data: Optional tripData or tripDataList response which is parsed right away
+        """
+        self.trips = []
+        """
+        Trips ordered by ID (oldest first)
+
+        :type trips: list[TripData]
+        """
+        if data is not None:
+            self.parse(data)
+
+    def parse(self, data):
+        entries = data.get('tripData')
+        if entries is None:
+            entries = (data.get('tripDataList') or {}).get('tripData')
+        if entries is None:
+            entries = []
+        elif isinstance(entries, dict):
+            entries = [entries]
+        self.trips = sorted((TripData(entry) for entry in entries), key=_trip_order)
+
+    @property
+    def newest(self):
+        """
+        :return: Latest trip or None if there are none
+        :rtype: TripData
+        """
+        if not self.trips:
+            return None
+        return self.trips[-1]
+
+    def since(self, trip_id):
+        """
+        :param trip_id: ID of the last known trip, None for all trips
+        :return: Trips which are newer than the given one
+        :rtype: list[TripData]
+        """
+        if trip_id is None:
+            return list(self.trips)
+        return [trip for trip in self.trips if trip.id is not None and trip.id > trip_id]
+
+    def __len__(self):
+        return len(self.trips)
+
+    def __str__(self):
+        return str([str(trip) for trip in self.trips])
+
+
+def _trip_order(trip: TripData):
+    return (trip.id is not None, trip.id or 0)
@@ -8,17 +8,32 @@ class Vehicle:
         self.csid = ''
         self.registered = ''
 
+    @classmethod
+    def from_values(cls, vin, csid, registered):
+        """
+        Creates a vehicle from already decoded values instead of a raw CSIDVins item
+        """
+        vehicle = cls()
+        vehicle.__assign(vin, csid, registered)
+        return vehicle
+
     def parse(self, data):
-        self.vin = data.get('VIN')
-        self.csid = data.get('CSID')
-        self.registered = data.get('registered')
+        self.__assign(data.get('VIN'), data.get('CSID'), data.get('registered'))
+
+    def __assign(self, vin, csid, registered):
+        self.vin = vin
+        self.csid = csid
+        self.registered = registered
 
     def __str__(self):
         return str(self.__dict__)
 
 
 class VehiclesResponse:
-    def __init__(self):
+    def __init__(self, data=None):
+        """
+        :param data: Optional getUserVINsResponse which is parsed right away
+        """
         self.vehicles = []
         """
         List of vehicles
@@ -26,6 +41,22 @@ class VehiclesResponse:
         :type vehicles: List[Vehicle]
         """
         self.blacklisted_vins = 0
+        if data is not None:
+            self.parse(data)
+
+    @classmethod
+    def from_values(cls, vehicles, blacklisted_vins):
+        """
+        Creates a response from already decoded values instead of a raw reply
+
+        :param vehicles: Vehicles
+        :type vehicles: List[Vehicle]
+        :param blacklisted_vins: Value of vinsOnBlacklist
+        """
+        response = cls()
+        response.vehicles = list(vehicles)
+        response.blacklisted_vins = blacklisted_vins
+        return response
 
     def parse(self, data):
         response = data.get('getUserVINsResponse')
@@ -1,10 +1,59 @@
+import sys
+from datetime import datetime
+
+
 class VehicleDataResponse:
     """
     Response from vehicle detail requests
     """
+    EAGER = 'eager'
+    """
+    Every field is parsed into a Field object
+    """
+    COLUMNAR = 'columnar'
+    """
+    Fields are stored as parallel columns, which needs a lot less memory
+    when many snapshots are kept. data_fields returns views on the rows
+    """
+    LAZY = 'lazy'
+    """
+    The raw fields are kept and only decoded when they are accessed.
+    Best if only a few fields of each response are read
+    """
 
-    def __init__(self, data):
-        self.data_fields = []
+    def __init__(self, data, mode: str = EAGER):
+        """
+        :param data: Stored or current vehicle data response or None for an empty response
+        :param mode: How the fields are stored, see EAGER, COLUMNAR and LAZY
+        """
+        if mode == self.COLUMNAR:
+            self.data_fields = FieldColumns()
+        elif mode == self.LAZY:
+            self.data_fields = LazyFields()
+        else:
+            self.data_fields = []
+        self.__by_name = None
+        self.__by_id = None
+        self.__typed = {}
+        if data is not None:
+            self.__parse(data, mode)
+        if mode != self.LAZY:
+            self.__build_index()
+
+    @classmethod
+    def from_fields(cls, fields):
+        """
+        Creates a response from already parsed fields
+
+        :param fields: List of Field
+        :rtype: VehicleDataResponse
+        """
+        response = cls(None)
+        response.data_fields = list(fields)
+        response.__build_index()
+        return response
+
+    def __parse(self, data, mode: str):
         response = data.get('StoredVehicleDataResponse')
         if response is None:
             response = data.get('CurrentVehicleDataByRequestResponse')
@@ -14,12 +63,230 @@ class VehicleDataResponse:
             return
 
         vehicle_data = vehicle_data.get('data')
+        if mode == self.COLUMNAR or mode == self.LAZY:
+            add = self.data_fields.append_raw
+        else:
+            add = self.__add_field
         for raw_data in vehicle_data:
             raw_fields = raw_data.get('field')
             if raw_fields is None:
                 continue
             for raw_field in raw_fields:
-                self.data_fields.append(Field(raw_field))
+                add(raw_field)
+
+    def __add_field(self, raw_field):
+        self.data_fields.append(Field(raw_field))
+
+    def __build_index(self):
+        if isinstance(self.data_fields, LazyFields):
+            # Names are resolved through NAME_IDS on lookup, so no field is decoded here
+            names = None
+            ids = self.data_fields.raw_ids()
+        elif isinstance(self.data_fields, FieldColumns):
+            names = self.data_fields.names
+            ids = self.data_fields.ids
+        else:
+            names = [field.name for field in self.data_fields]
+            ids = [field.id for field in self.data_fields]
+        # The first field wins if a name or ID occurs more than once
+        indices = range(len(ids) - 1, -1, -1)
+        self.__by_name = {} if names is None else {names[index]: index for index in indices}
+        self.__by_id = {ids[index]: index for index in indices}
+        self.__lower_ids = False
+
+    def __find_id(self, field_id: str):
+        index = self.__by_id.get(field_id)
+        if index is None and not self.__lower_ids:
+            # Add case insensitive aliases the first time an ID is not found as is
+            self.__lower_ids = True
+            for known_id, known_index in list(self.__by_id.items()):
+                if known_id is not None:
+                    self.__by_id.setdefault(known_id.lower(), known_index)
+        if index is None:
+            index = self.__by_id.get(field_id.lower())
+        return index
+
+    def __find(self, key: str):
+        if self.__by_id is None:
+            self.__build_index()
+        if key.startswith(('0x', '0X')):
+            return self.__find_id(key)
+        index = self.__by_name.get(key)
+        if index is not None or not isinstance(self.data_fields, LazyFields):
+            return index
+
+        field_id = NAME_IDS.get(key)
+        if field_id is not None:
+            return self.__find_id(field_id)
+        # Unknown fields are named by their text ID
+        for index, raw_field in enumerate(self.data_fields.raw_fields()):
+            if raw_field.get('textId') == key and Field.decoder_for(raw_field.get('id')) is None:
+                self.__by_name[key] = index
+                return index
+        return None
+
+    def get(self, key: str):
+        """
+        Returns the field with the given name or ID
+
+        :param key: Field name (e.g. TOTAL_RANGE) or ID (e.g. 0x0301030005, case insensitive)
+        :return: Field or None if the response doesn't contain it
+        :rtype: Field
+        """
+        index = self.__find(key)
+        if index is None:
+            return None
+        return self.data_fields[index]
+
+    def get_value(self, key: str, default=None):
+        """
+        Returns the typed value of the field with the given name or ID.
+        The value is converted only once
+
+        :param key: Field name or ID
+        :param default: Returned if the response doesn't contain the field
+        :return: Value (see Field.typed_value)
+        """
+        cache_key = ('value', key)
+        if cache_key not in self.__typed:
+            field = self.get(key)
+            if field is None:
+                return default
+            self.__typed[cache_key] = field.typed_value
+        return self.__typed[cache_key]
+
+    def get_measure_time(self, key: str):
+        """
+        Returns when the field with the given name or ID has been captured by the car.
+        The timestamp is parsed only once
+
+        :param key: Field name or ID
+        :return: Timestamp or None if the field or its timestamp is missing
+        :rtype: datetime
+        """
+        cache_key = ('time', key)
+        if cache_key not in self.__typed:
+            field = self.get(key)
+            if field is None:
+                return None
+            self.__typed[cache_key] = parse_timestamp(field.measure_time)
+        return self.__typed[cache_key]
+
+    @property
+    def mileage_km(self):
+        return self.get_value('UTC_TIME_AND_KILOMETER_STATUS')
+
+    @property
+    def total_range_km(self):
+        return self.get_value('TOTAL_RANGE')
+
+    @property
+    def state_of_charge(self):
+        return self.get_value('STATE_OF_CHARGE')
+
+    @property
+    def tank_level(self):
+        return self.get_value('TANK_LEVEL_IN_PERCENTAGE')
+
+    @property
+    def temperature_outside(self):
+        return self.get_value('TEMPERATURE_OUTSIDE')
+
+    @property
+    def newest_send_time(self):
+        """
+        Time at which the car sent the newest field of this response
+
+        :return: Timestamp or None if no field has one
+        :rtype: datetime
+        """
+        if isinstance(self.data_fields, LazyFields):
+            send_times = [raw_field.get('tsCarSent') for raw_field in self.data_fields.raw_fields()]
+        elif isinstance(self.data_fields, FieldColumns):
+            send_times = self.data_fields.send_times
+        else:
+            send_times = [field.send_time for field in self.data_fields]
+        # ISO timestamps of the same format can be compared as strings
+        send_times = [send_time for send_time in send_times if send_time]
+        if not send_times:
+            return None
+        return parse_timestamp(max(send_times))
+
+    @property
+    def doors(self):
+        """
+        Lock and open states of all doors, the trunk lid and the hood
+
+        :rtype: DoorStates
+        """
+        cache_key = ('doors', None)
+        if cache_key not in self.__typed:
+            self.__typed[cache_key] = DoorStates(self)
+        return self.__typed[cache_key]
+
+
+class DoorState:
+    """
+    Lock and open state of a single door. Unknown states are None
+    """
+    __slots__ = ('locked', 'open')
+
+    LOCKED = 2
+    CLOSED = 3
+
+    def __init__(self, response: VehicleDataResponse, suffix: str):
+        self.locked = self.__check(response.get_value('LOCK_STATE_' + suffix), self.LOCKED)
+        self.open = self.__check(response.get_value('OPEN_STATE_' + suffix), self.CLOSED, negate=True)
+
+    @staticmethod
+    def __check(value, expected: int, negate: bool = False):
+        if value is None:
+            return None
+        return (value == expected) != negate
+
+    def __str__(self):
+        return 'locked: ' + str(self.locked) + ', open: ' + str(self.open)
+
+
+class DoorStates:
+    """
+    States of all doors of a vehicle
+    """
+    __slots__ = ('left_front', 'left_rear', 'right_front', 'right_rear', 'trunk_lid', 'hood')
+
+    def __init__(self, response: VehicleDataResponse):
+        self.left_front = DoorState(response, 'LEFT_FRONT_DOOR')
+        self.left_rear = DoorState(response, 'LEFT_REAR_DOOR')
+        self.right_front = DoorState(response, 'RIGHT_FRONT_DOOR')
+        self.right_rear = DoorState(response, 'RIGHT_REAR_DOOR')
+        self.trunk_lid = DoorState(response, 'TRUNK_LID')
+        self.hood = DoorState(response, 'HOOD')
+
+    def all(self):
+        return [self.left_front, self.left_rear, self.right_front, self.right_rear, self.trunk_lid, self.hood]
+
+    @property
+    def all_locked(self):
+        """
+        True if all doors with a known lock state are locked, None if no lock state is known
+        """
+        states = [door.locked for door in self.all() if door.locked is not None]
+        if not states:
+            return None
+        return all(states)
+
+    @property
+    def any_open(self):
+        """
+        True if any door is open, None if no open state is known
+        """
+        states = [door.open for door in self.all() if door.open is not None]
+        if not states:
+            return None
+        return any(states)
+
+    def __str__(self):
+        return str({name: str(getattr(self, name)) for name in self.__slots__})
 
 
 class Field:
@@ -72,26 +339,311 @@ class Field:
            '0x0301020001': 'TEMPERATURE_OUTSIDE',
            '0x0202': 'ACTIVE_INSTRUMENT_CLUSTER_WARNING'}
 
+    __slots__ = ('name', 'id', 'unit', 'value', 'measure_time', 'send_time', 'measure_mileage', 'send_mileage')
+
     def __init__(self, data):
-        self.name = None
-        self.id = data.get('id')
-        self.unit = data.get('unit')
-        self.value = data.get('value')
-        self.measure_time = data.get('tsCarCaptured')
-        self.send_time = data.get('tsCarSent')
-        self.measure_mileage = data.get('milCarCaptured')
-        self.send_mileage = data.get('milCarSent')
-
-        for field_id, name in self.IDS.items():
-            if field_id == self.id:
-                self.name = name
-                break
-        if self.name is None:
+        self.__assign(data.get('id'), data.get('unit'), data.get('value'), data.get('tsCarCaptured'),
+                      data.get('tsCarSent'), data.get('milCarCaptured'), data.get('milCarSent'), data.get('textId'))
+
+    @classmethod
+    def from_values(cls, field_id, unit, value, measure_time, send_time, measure_mileage, send_mileage, text_id):
+        """
+        Creates a field from already decoded values instead of a raw field dict
+        """
+        field = cls.__new__(cls)
+        field.__assign(field_id, unit, value, measure_time, send_time, measure_mileage, send_mileage, text_id)
+        return field
+
+    def __assign(self, field_id, unit, value, measure_time, send_time, measure_mileage, send_mileage, text_id):
+        self.id = _intern(field_id)
+        self.unit = _intern(unit)
+        self.value = value
+        self.measure_time = measure_time
+        self.send_time = send_time
+        self.measure_mileage = measure_mileage
+        self.send_mileage = send_mileage
+
+        decoder = Field.decoder_for(self.id)
+        if decoder is None:
             # No direct mapping found - maybe we've at least got a text id
-            self.name = data.get('textId')
+            self.name = text_id
+        else:
+            self.name = decoder.name
+
+    @property
+    def default_unit(self):
+        """
+        Usual unit of the field (e.g. km for ranges) or None if it is unknown.
+        Unlike unit it doesn't come from the backend, so it is known even if the reply has no unit
+        """
+        decoder = Field.decoder_for(self.id)
+        if decoder is None:
+            return None
+        return decoder.unit
+
+    @property
+    def typed_value(self):
+        """
+        Value converted to the type of the field (e.g. int for ranges).
+        Unknown fields or values which can't be converted are returned as they are
+        """
+        decoder = Field.decoder_for(self.id)
+        if decoder is None:
+            return self.value
+        return decoder.decode(self.value)
+
+    @staticmethod
+    def decoder_for(field_id):
+        """
+        Returns the decoder of the given field ID.
+        The hex digits of the ID are matched case insensitive
+
+        :param field_id: Field ID e.g. 0x030103000A
+        :return: Decoder or None if the ID is unknown
+        :rtype: FieldDecoder
+        """
+        decoder = DECODERS.get(field_id)
+        if decoder is None and field_id is not None:
+            decoder = DECODERS.get(field_id.lower())
+        return decoder
 
     def __str__(self):
         str_rep = str(self.name) + ' ' + str(self.value)
         if self.unit is not None:
             str_rep += self.unit
         return str_rep
+
+
+class FieldColumns:
+    """
+    Stores fields as parallel columns. Strings which repeat between fields and
+    snapshots (IDs, names, units, timestamps) are interned.
+    Indexing returns a FieldView which has the same attributes as a Field
+    """
+    __slots__ = ('ids', 'names', 'units', 'values', 'measure_times', 'send_times', 'measure_mileages',
+                 'send_mileages')
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.units = []
+        self.values = []
+        self.measure_times = []
+        self.send_times = []
+        self.measure_mileages = []
+        self.send_mileages = []
+
+    def append_raw(self, data):
+        """
+        Adds a raw field as found in the vehicle data response
+        """
+        field_id = data.get('id')
+        unit = data.get('unit')
+        decoder = Field.decoder_for(field_id)
+        if decoder is None:
+            name = _intern(data.get('textId'))
+        else:
+            name = decoder.name
+        self.ids.append(_intern(field_id))
+        self.names.append(name)
+        self.units.append(_intern(unit))
+        self.values.append(_intern(data.get('value')))
+        self.measure_times.append(_intern(data.get('tsCarCaptured')))
+        self.send_times.append(_intern(data.get('tsCarSent')))
+        self.measure_mileages.append(data.get('milCarCaptured'))
+        self.send_mileages.append(data.get('milCarSent'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [FieldView(self, i) for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError('field index out of range')
+        return FieldView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield FieldView(self, index)
+
+
+class LazyFields:
+    """
+    Keeps the raw fields and decodes each one into a Field on first access
+    """
+    __slots__ = ('_raw', '_fields')
+
+    def __init__(self):
+        self._raw = []
+        self._fields = {}
+
+    def append_raw(self, data):
+        """
+        Adds a raw field as found in the vehicle data response
+        """
+        self._raw.append(data)
+
+    def raw_fields(self):
+        return self._raw
+
+    def raw_ids(self):
+        return [raw_field.get('id') for raw_field in self._raw]
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._raw)))]
+        if index < 0:
+            index += len(self._raw)
+        field = self._fields.get(index)
+        if field is None:
+            field = self._fields[index] = Field(self._raw[index])
+        return field
+
+    def __iter__(self):
+        for index in range(len(self._raw)):
+            yield self[index]
+
+
+class FieldView:
+    """
+    Lazy view on a single row of FieldColumns
+    """
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns: FieldColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def name(self):
+        return self._columns.names[self._index]
+
+    @property
+    def id(self):
+        return self._columns.ids[self._index]
+
+    @property
+    def unit(self):
+        return self._columns.units[self._index]
+
+    @property
+    def value(self):
+        return self._columns.values[self._index]
+
+    @property
+    def measure_time(self):
+        return self._columns.measure_times[self._index]
+
+    @property
+    def send_time(self):
+        return self._columns.send_times[self._index]
+
+    @property
+    def measure_mileage(self):
+        return self._columns.measure_mileages[self._index]
+
+    @property
+    def send_mileage(self):
+        return self._columns.send_mileages[self._index]
+
+    default_unit = Field.default_unit
+    typed_value = Field.typed_value
+    __str__ = Field.__str__
+
+
+def parse_timestamp(value):
+    """
+    Parses a timestamp as sent by the backend (e.g. 2019-03-01T12:00:00Z)
+
+    :return: Timezone aware datetime or None if the value is missing or invalid
+    :rtype: datetime
+    """
+    if not value:
+        return None
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _intern(value):
+    if value is None or type(value) is not str:
+        return value
+    return sys.intern(value)
+
+
+def _to_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+class FieldDecoder:
+    """
+    Describes how the value of a known field ID is decoded
+    """
+    __slots__ = ('name', 'convert', 'unit')
+
+    def __init__(self, name: str, convert=_to_number, unit: str = None):
+        """
+        :param name: Name of the field
+        :param convert: Converts the raw value or None to keep the raw value
+        :param unit: Usual unit of the field, see Field.default_unit
+        """
+        self.name = name
+        self.convert = convert
+        self.unit = unit
+
+    def decode(self, value):
+        if self.convert is None or value is None:
+            return value
+        try:
+            return self.convert(value)
+        except (TypeError, ValueError):
+            return value
+
+
+def _build_decoders():
+    units = {'UTC_TIME_AND_KILOMETER_STATUS': 'km',
+             'MAINTENANCE_INTERVAL_DISTANCE_TO_OIL_CHANGE': 'km',
+             'MAINTENANCE_INTERVAL_DISTANCE_TO_INSPECTION': 'km',
+             'MAINTENANCE_INTERVAL_TIME_TO_OIL_CHANGE': 'd',
+             'MAINTENANCE_INTERVAL_TIME_TO_INSPECTION': 'd',
+             'OIL_LEVEL_DIPSTICKS_PERCENTAGE': '%',
+             'ADBLUE_RANGE': 'km',
+             'TOTAL_RANGE': 'km',
+             'PRIMARY_RANGE': 'km',
+             'SECONDARY_RANGE': 'km',
+             'TANK_LEVEL_IN_PERCENTAGE': '%',
+             'STATE_OF_CHARGE': '%'}
+    raw_values = {'UNKNOWN'}
+
+    decoders = {}
+    for field_id, name in Field.IDS.items():
+        convert = None if name in raw_values else _to_number
+        decoder = FieldDecoder(name, convert, units.get(name))
+        # Register the common spellings so the hot path is a single lookup
+        decoders[field_id] = decoder
+        decoders[field_id.lower()] = decoder
+        decoders['0x' + field_id[2:].upper()] = decoder
+    return decoders
+
+
+DECODERS = _build_decoders()
+"""
+Decoder by field ID
+"""
+
+NAME_IDS = {name: field_id for field_id, name in Field.IDS.items()}
+"""
+Field ID by field name
+"""
@@ -0,0 +1,58 @@
+"""
+Measures parsing of stored vehicle data responses.
+
+Usage: python -m benchmark.FieldDecodingBenchmark [responses]
+"""
+import sys
+import time
+
+from audiapi.model.VehicleDataResponse import VehicleDataResponse, Field
+from benchmark import Payloads
+
+
+def linear_lookup(field_id):
+    """
+    Name lookup as done before the decoder table, for comparison
+    """
+    for known_id, name in Field.IDS.items():
+        if known_id == field_id:
+            return name
+    return None
+
+
+def read_two(response: VehicleDataResponse):
+    return response.state_of_charge, response.get_value('LOCK_STATE_LEFT_FRONT_DOOR')
+
+
+def iter_raw_fields(responses):
+    for response in responses:
+        for group in response['StoredVehicleDataResponse']['vehicleData']['data']:
+            yield from group['field']
+
+
+def measure(name: str, count: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print('{:<28} {:>10.3f}s {:>12.1f} us/item'.format(name, elapsed, elapsed / count * 1e6))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    responses = Payloads.corpus(size)
+    raw_fields = list(iter_raw_fields(responses))
+    print('{} responses, {} fields'.format(len(responses), len(raw_fields)))
+
+    measure('linear id lookup', len(raw_fields), lambda: [linear_lookup(f['id']) for f in raw_fields])
+    measure('decoder lookup', len(raw_fields), lambda: [Field.decoder_for(f['id']) for f in raw_fields])
+    measure('parse response', len(responses), lambda: [VehicleDataResponse(r) for r in responses])
+    for mode in (VehicleDataResponse.EAGER, VehicleDataResponse.COLUMNAR, VehicleDataResponse.LAZY):
+        measure('parse + 2 reads ' + mode, len(responses), lambda: [read_two(VehicleDataResponse(r, mode=mode))
+                                                                    for r in responses])
+    parsed = [VehicleDataResponse(r) for r in responses]
+    measure('typed values', len(raw_fields),
+            lambda: [f.typed_value for response in parsed for f in response.data_fields])
+
+
+if __name__ == '__main__':
+    main()
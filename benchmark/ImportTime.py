@@ -0,0 +1,93 @@
+"""
+Measures how long importing the package takes with python -X importtime and fails
+if a module pulls in heavy dependencies it doesn't need at import time
+(the HTTP client, the optional JSON backends, NumPy).
+
+Usage: python -m benchmark.ImportTime [--runs count] [--budget ms]
+
+Every import runs in a fresh interpreter, the best of all runs is reported.
+The exit code is 1 if any check fails, tests/test_import_time.py runs it as a regression test.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+HEAVY = ('requests', 'urllib3', 'aiohttp', 'numpy', 'msgspec', 'orjson', 'ujson')
+"""
+Modules which must not be imported by the checked modules
+"""
+
+CHECKS = ['audiapi', 'audiapi.Services', 'audiapi.API', 'audiapi.Client', 'audiapi.Fleet',
+          'audiapi.model.VehicleDataResponse']
+"""
+Modules whose imports are checked
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(statement: str):
+    """
+    Runs the statement with -X importtime in a fresh interpreter
+
+    :return: Cumulative import time in microseconds by module and the names of the modules
+    which were imported directly by the statement
+    :rtype: tuple[dict[str, int], list[str]]
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    top_level = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            # Header line
+            continue
+        name = parts[2].strip()
+        times[name] = int(parts[1])
+        # Nested imports are indented by two more spaces per level
+        if len(parts[2]) - len(parts[2].lstrip()) == 1:
+            top_level.append(name)
+    return times, top_level
+
+
+def check(module: str, runs: int, baseline):
+    """
+    :param baseline: Modules imported by the interpreter itself, they are ignored
+    :return: Best import time in ms and the heavy modules which were imported
+    """
+    best = None
+    heavy = set()
+    for _ in range(runs):
+        times, top_level = import_times('import ' + module)
+        total = sum(times[name] for name in top_level if name not in baseline) / 1000.0
+        best = total if best is None else min(best, total)
+        heavy.update(name for name in times if name not in baseline and name in HEAVY)
+    return best, sorted(heavy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the import time of the package')
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs per module')
+    parser.add_argument('--budget', type=float, default=None, help='Maximum import time of every module in ms')
+    options = parser.parse_args()
+
+    baseline = set(import_times('pass')[0])
+    failed = False
+    print('{:<40} {:>8}  {}'.format('module', 'ms', 'heavy imports'))
+    for module in CHECKS:
+        best, heavy = check(module, options.runs, baseline)
+        over_budget = options.budget is not None and best > options.budget
+        failed = failed or bool(heavy) or over_budget
+        print('{:<40} {:>8.1f}  {}{}'.format(module, best, ', '.join(heavy) or '-',
+                                             '  (over budget)' if over_budget else ''))
+    if failed:
+        print('Import time regression')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
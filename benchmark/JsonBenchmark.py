@@ -0,0 +1,42 @@
+"""
+Compares the JSON backends on stored vehicle data replies.
+
+Usage: python -m benchmark.JsonBenchmark [responses]
+"""
+import json
+import sys
+import time
+
+from audiapi.JsonBackend import BACKENDS
+from audiapi.model.VehicleDataResponse import VehicleDataResponse
+from benchmark import Payloads
+
+
+def measure(name: str, count: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print('{:<28} {:>10.3f}s {:>10.1f} us/reply'.format(name, elapsed, elapsed / count * 1e6))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    replies = [json.dumps(payload).encode('utf-8') for payload in Payloads.corpus(size)]
+    print('{} replies, {:.1f} KiB each'.format(size, sum(len(r) for r in replies) / size / 1024))
+
+    for backend_type in BACKENDS:
+        try:
+            backend = backend_type()
+        except ImportError:
+            print('{:<28} not installed'.format(backend_type.NAME))
+            continue
+        measure(backend.NAME + ' decode', size, lambda: [backend.loads(r) for r in replies])
+        measure(backend.NAME + ' decode + parse', size,
+                lambda: [VehicleDataResponse(backend.loads(r)) for r in replies])
+        if backend.decode_model(replies[0], VehicleDataResponse) is not None:
+            measure(backend.NAME + ' typed decode', size,
+                    lambda: [backend.decode_model(r, VehicleDataResponse) for r in replies])
+
+
+if __name__ == '__main__':
+    main()
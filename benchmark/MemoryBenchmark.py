@@ -0,0 +1,35 @@
+"""
+Measures the memory which is needed to keep parsed vehicle data snapshots.
+
+Usage: python -m benchmark.MemoryBenchmark [snapshots]
+"""
+import gc
+import sys
+import tracemalloc
+
+from audiapi.model.VehicleDataResponse import VehicleDataResponse
+from benchmark import Payloads
+
+
+def measure(name: str, count: int, parse):
+    gc.collect()
+    tracemalloc.start()
+    # Payloads are created while tracing, so strings which are shared
+    # between the decoded JSON and the snapshots are counted as well
+    snapshots = [parse(Payloads.stored_vehicle_data(Payloads.vin(i % 500), seed=i)) for i in range(count)]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    fields = sum(len(snapshot.data_fields) for snapshot in snapshots)
+    print('{:<10} {:>8} snapshots {:>10.1f} MiB {:>8.1f} bytes/field'.format(
+        name, count, size / 2 ** 20, size / fields))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    measure('eager', count, VehicleDataResponse)
+    measure('columnar', count, lambda data: VehicleDataResponse(data, mode=VehicleDataResponse.COLUMNAR))
+
+
+if __name__ == '__main__':
+    main()
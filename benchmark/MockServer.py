@@ -0,0 +1,268 @@
+import itertools
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from audiapi.model.ClimaRequest import ClimaActionStatus
+from audiapi.model.RequestStatus import RequestStatus
+from benchmark import Payloads
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Answers requests using the routes of the server, or its payload if it has none
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self._reply()
+
+    def do_PUT(self):
+        self._reply()
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length > 0:
+            self.rfile.read(length)
+        status, body = self.server.mock.respond(self.command, self.path)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Route:
+    """
+    Answers requests whose path matches a pattern
+    """
+
+    def __init__(self, method: str, pattern: str, handler):
+        """
+        :param method: HTTP method
+        :param pattern: Regular expression which is searched in the path
+        :param handler: Callable which receives the match and returns the JSON data, or a tuple of
+        status and JSON data. Data which is already bytes is sent as it is
+        """
+        self.method = method
+        self.pattern = re.compile(pattern)
+        self.handler = handler
+
+
+class MockServer:
+    """
+    Local stand-in for msg.audi.de which runs in a background thread
+    """
+
+    def __init__(self, payload=None, port: int = 0, routes=None, latency=0.0, error_rate: float = 0.0,
+                 seed: int = 0):
+        """
+        :param payload: JSON data which is returned for every request if no routes are given
+        :param port: Port to listen on, 0 picks a free one
+        :param routes: List of Route, see audi_routes
+        :param latency: Seconds each reply is delayed, or a (min, max) tuple for a random delay
+        :param error_rate: Share of requests which are answered with 503
+        :param seed: Seed for latency and errors
+        """
+        if payload is None:
+            payload = {}
+        self.__server = ThreadingHTTPServer(('127.0.0.1', port), MockHandler)
+        self.__server.daemon_threads = True
+        self.__server.mock = self
+        self.__payload = self.encode(payload)
+        self.__routes = routes
+        self.__latency = latency
+        self.__error_rate = error_rate
+        self.__error = self.encode(Payloads.gateway_error())
+        self.__random = random.Random(seed)
+        self.__thread = None
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.__server.server_address[:2]
+        return 'http://' + host + ':' + str(port)
+
+    def respond(self, method: str, path: str):
+        """
+        :return: Status and body of the reply to the request
+        """
+        self.requests += 1
+        latency = self.__latency
+        if isinstance(latency, tuple):
+            latency = self.__random.uniform(*latency)
+        if latency > 0:
+            time.sleep(latency)
+        if self.__error_rate > 0 and self.__random.random() < self.__error_rate:
+            return 503, self.__error
+        if self.__routes is None:
+            return 200, self.__payload
+
+        for route in self.__routes:
+            if route.method != method:
+                continue
+            match = route.pattern.search(path)
+            if match is None:
+                continue
+            result = route.handler(match)
+            status = 200
+            if isinstance(result, tuple):
+                status, result = result
+            return status, self.encode(result)
+        return 404, self.encode(Payloads.gateway_error('gw.error.notfound', 'No route for ' + path))
+
+    @staticmethod
+    def encode(data):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode('utf-8')
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def audi_routes(vehicle_count: int = 1, job_polls: int = 2, trip_count: int = 20):
+    """
+    Builds routes which answer the most common requests like the real backend
+
+    :param vehicle_count: Number of vehicles in the vehicle list, see Payloads.vin
+    :param job_polls: Number of status polls until a job (vehicle data request, clima action) is finished
+    :param trip_count: Number of trips of each vehicle and trip type
+    :return: Routes
+    :rtype: list[Route]
+    """
+    vehicle_data = {}
+    jobs = {}
+    ids = itertools.count(1)
+    lock = threading.Lock()
+
+    def seed(vin: str):
+        return int(vin[-6:]) if vin[-6:].isdigit() else 0
+
+    def stored_vehicle_data(match):
+        vin = match.group('vin')
+        body = vehicle_data.get(vin)
+        if body is None:
+            body = MockServer.encode(Payloads.stored_vehicle_data(vin, seed(vin)))
+            vehicle_data[vin] = body
+        return body
+
+    def start_job(match):
+        job_id = next(ids)
+        with lock:
+            jobs[job_id] = job_polls
+        return job_id
+
+    def poll_job(job_id: int):
+        """
+        :return: True if the job is finished
+        """
+        with lock:
+            remaining = jobs.get(job_id, 0)
+            if remaining > 0:
+                jobs[job_id] = remaining - 1
+            return remaining <= 0
+
+    def request_vehicle_data(match):
+        return 202, Payloads.current_vehicle_data_request(match.group('vin'), str(start_job(match)))
+
+    def job_status(match):
+        status = RequestStatus.IN_PROGRESS
+        if poll_job(int(match.group('id'))):
+            status = RequestStatus.SUCCESS
+        return Payloads.request_status(match.group('vin'), status)
+
+    def requested_vehicle_data(match):
+        vin = match.group('vin')
+        return Payloads.stored_vehicle_data(vin, seed(vin), root='CurrentVehicleDataByRequestResponse')
+
+    def trip_list(match):
+        vin = match.group('vin')
+        return Payloads.trips(match.group('type'), trip_count, seed(vin))
+
+    def clima_action(match):
+        return 202, Payloads.clima_action(start_job(match), ClimaActionStatus.QUEUED)
+
+    def clima_action_status(match):
+        action_id = int(match.group('id'))
+        state = ClimaActionStatus.SUCCESS if poll_job(action_id) else ClimaActionStatus.FETCHED
+        return Payloads.clima_action(action_id, state)
+
+    vehicles = MockServer.encode(Payloads.vehicles(vehicle_count))
+    vin = r'/vehicles/(?P<vin>[^/?]+)'
+    return [Route('POST', r'/core/auth/v1/.*/token$', lambda match: Payloads.token()),
+            Route('GET', r'/myaudi/carservice/v2/.*/vehicles$', lambda match: vehicles),
+            Route('GET', r'/bs/vsr/v1/.*' + vin + r'/status$', stored_vehicle_data),
+            Route('POST', r'/bs/vsr/v1/.*' + vin + r'/requests$', request_vehicle_data),
+            Route('GET', r'/bs/vsr/v1/.*' + vin + r'/requests/(?P<id>\d+)/jobstatus$', job_status),
+            Route('GET', r'/bs/vsr/v1/.*' + vin + r'/requests/(?P<id>\d+)/status$', requested_vehicle_data),
+            Route('GET', r'/bs/batterycharge/v1/.*' + vin + r'/charger$',
+                  lambda match: Payloads.battery_charge(seed(match.group('vin')))),
+            Route('GET', r'/bs/climatisation/v1/.*' + vin + r'/climater$',
+                  lambda match: Payloads.climater(seed(match.group('vin')))),
+            Route('GET', r'/bs/tripstatistics/v1/.*' + vin + r'/tripdata/(?P<type>\w+)\?type=list$', trip_list),
+            Route('POST', r'/bs/climatisation/v1/.*' + vin + r'/climater/actions$', clima_action),
+            Route('GET', r'/bs/climatisation/v1/.*' + vin + r'/climater/actions/(?P<id>\d+)$', clima_action_status)]
+
+
+def _serve(connection, vehicle_count: int, job_polls: int, options: dict):
+    server = MockServer(routes=audi_routes(vehicle_count, job_polls), **options).start()
+    connection.send(server.url)
+    connection.recv()
+    server.stop()
+
+
+class MockServerProcess:
+    """
+    Runs a MockServer with the audi routes in a child process,
+    so serving requests doesn't compete with the measured code for the GIL
+    """
+
+    def __init__(self, vehicle_count: int = 1, job_polls: int = 2, **options):
+        """
+        :param vehicle_count: Number of vehicles, see audi_routes
+        :param job_polls: Number of polls until a job is finished, see audi_routes
+        :param options: Options of the MockServer (latency, error_rate, seed)
+        """
+        self.__connection, child = multiprocessing.Pipe()
+        self.__process = multiprocessing.Process(target=_serve, args=(child, vehicle_count, job_polls, options),
+                                                 daemon=True)
+        self.url = None
+
+    def start(self):
+        self.__process.start()
+        self.url = self.__connection.recv()
+        return self
+
+    def stop(self):
+        self.__connection.send(None)
+        self.__process.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,193 @@
+"""
+Realistic msg.audi.de payloads for benchmarks
+"""
+import random
+
+from audiapi.model.VehicleDataResponse import Field
+
+_TIMESTAMP = '2019-03-{day:02d}T{hour:02d}:{minute:02d}:00Z'
+
+
+_WARNINGS = frozenset(['WARNING_OIL_CHANGE', 'OIL_LEVEL_MINIMUM_WARNING', 'MAINTENANCE_INTERVAL_ALARM_INSPECTION',
+                       'ACTIVE_INSTRUMENT_CLUSTER_WARNING'])
+
+
+def field_value(name: str, rnd: random.Random, mileage: int):
+    """
+    Builds a plausible raw value of a known field, mostly a locked and closed car without warnings
+
+    :param name: Name of the field, see Field.IDS
+    :param rnd: Random number generator
+    :param mileage: Mileage of the vehicle in km
+    :rtype: str
+    """
+    if name.startswith('LOCK_STATE_') or name.startswith('SAFETY_STATE_'):
+        # 2: locked, 3: unlocked
+        value = 2 if rnd.random() < 0.95 else 3
+    elif name.startswith('OPEN_STATE_') or (name.startswith('STATE_') and name != 'STATE_OF_CHARGE') \
+            or name in ('LIGHT_STATUS', 'BRAKING_STATUS'):
+        # 2: open (or on), 3: closed (or off)
+        value = 3 if rnd.random() < 0.95 else 2
+    elif name in _WARNINGS:
+        value = 1 if rnd.random() < 0.05 else 0
+    elif name.endswith('PERCENTAGE') or name == 'STATE_OF_CHARGE':
+        value = rnd.randint(0, 100)
+    elif name.endswith('RANGE'):
+        value = rnd.randint(0, 800)
+    elif name.startswith('MAINTENANCE_INTERVAL_DISTANCE'):
+        value = rnd.randint(0, 30000)
+    elif name.startswith('MAINTENANCE_INTERVAL_TIME'):
+        value = rnd.randint(0, 730)
+    elif name == 'MAINTENANCE_INTERVAL_MONTHLY_MILEAGE':
+        value = rnd.randint(0, 5000)
+    elif name == 'OIL_LEVEL_AMOUNT_IN_LITERS':
+        value = round(rnd.uniform(3.0, 6.0), 1)
+    elif name == 'UTC_TIME_AND_KILOMETER_STATUS':
+        value = mileage
+    elif name == 'TEMPERATURE_OUTSIDE':
+        # Decikelvin, -20 to 40 degrees celsius
+        value = rnd.randint(2532, 3132)
+    elif name.endswith('_DRIVE'):
+        # 0: gasoline, 3: electric
+        value = rnd.choice((0, 3))
+    else:
+        value = rnd.randint(0, 500)
+    return str(value)
+
+
+def vin(index: int):
+    return 'WAUZZZ{:011d}'.format(index)
+
+
+def stored_vehicle_data(vin_value: str, seed: int = 0, unknown_fields: int = 6,
+                        root: str = 'StoredVehicleDataResponse'):
+    """
+    Builds a stored vehicle data response with all known fields and some unknown ones
+
+    :param vin_value: VIN of the vehicle
+    :param seed: Seed for the field values
+    :param unknown_fields: Number of fields which are only identified by their text ID
+    :param root: Name of the root element
+    """
+    rnd = random.Random(seed)
+    day = rnd.randint(1, 28)
+    hour = rnd.randint(0, 23)
+    mileage = rnd.randint(1000, 200000)
+    groups = {}
+    for field_id in Field.IDS:
+        if field_id == '0x0':
+            continue
+        group_id = field_id[:8]
+        timestamp = _TIMESTAMP.format(day=day, hour=hour, minute=rnd.randint(0, 59))
+        groups.setdefault(group_id, []).append({
+            'id': field_id,
+            'tsCarSentUtc': timestamp,
+            'tsCarSent': timestamp,
+            'tsCarCaptured': timestamp,
+            'milCarCaptured': mileage,
+            'milCarSent': mileage,
+            'value': field_value(Field.IDS[field_id], rnd, mileage),
+            'unit': 'km' if 'RANGE' in Field.IDS[field_id] else None,
+            'textId': Field.IDS[field_id].lower()
+        })
+    groups['0x0204FFFF'] = [{'id': '0x0204FF{:04X}'.format(i), 'tsCarCaptured': _TIMESTAMP.format(
+        day=day, hour=hour, minute=0), 'value': str(rnd.randint(0, 9)), 'textId': 'unknown_' + str(i)}
+                            for i in range(unknown_fields)]
+
+    data = [{'id': group_id, 'field': fields} for group_id, fields in groups.items()]
+    return {root: {'vin': vin_value, 'vehicleData': {'data': data}}}
+
+
+def corpus(size: int):
+    """
+    Builds a list of stored vehicle data responses for different vehicles
+    """
+    return [stored_vehicle_data(vin(i), seed=i) for i in range(size)]
+
+
+def vehicles(count: int):
+    """
+    Builds a vehicle list response of the car service
+    """
+    return {'getUserVINsResponse': {
+        'CSIDVins': [{'CSID': 'CSID{:07d}'.format(i), 'VIN': vin(i), 'registered': '2018-02-15T18:06:39.000+01:00'}
+                     for i in range(count)],
+        'vinsOnBlacklist': 0}}
+
+
+def current_vehicle_data_request(vin_value: str, request_id: str):
+    return {'CurrentVehicleDataResponse': {'requestId': request_id, 'vin': vin_value}}
+
+
+def request_status(vin_value: str, status: str):
+    return {'requestStatusResponse': {'vin': vin_value, 'status': status}}
+
+
+def battery_charge(seed: int = 0):
+    rnd = random.Random(seed)
+    timestamp = _TIMESTAMP.format(day=rnd.randint(1, 28), hour=rnd.randint(0, 23), minute=rnd.randint(0, 59))
+    state = rnd.choice(['off', 'charging', 'completed'])
+
+    def content(value):
+        return {'content': value, 'timestamp': timestamp}
+
+    return {'charger': {
+        'settings': {'maxChargeCurrent': content(32)},
+        'status': {
+            'chargingStatusData': {'chargingMode': content('invalid'), 'chargingState': content(state),
+                                   'chargingReason': content('invalid'),
+                                   'externalPowerSupplyState': content('unavailable'),
+                                   'energyFlow': content('on' if state == 'charging' else 'off')},
+            'batteryStatusData': {'stateOfCharge': content(rnd.randint(5, 100)),
+                                  'remainingChargingTime': content(rnd.randint(0, 600))},
+            'cruisingRangeStatusData': {'primaryEngineRange': content(rnd.randint(20, 400)),
+                                        'engineTypeFirstEngine': content('typeIsElectric')}}}}
+
+
+def climater(seed: int = 0):
+    rnd = random.Random(seed)
+    timestamp = _TIMESTAMP.format(day=rnd.randint(1, 28), hour=rnd.randint(0, 23), minute=rnd.randint(0, 59))
+
+    def content(value):
+        return {'content': value, 'timestamp': timestamp}
+
+    return {'climater': {
+        'settings': {'targetTemperature': content(2955), 'climatisationWithoutHVpower': content(False),
+                     'heaterSource': content('electric')},
+        'status': {
+            'climatisationStatusData': {'climatisationState': content(rnd.choice(['off', 'heating'])),
+                                        'remainingClimatisationTime': content(rnd.randint(0, 30)),
+                                        'climatisationReason': content('missing')},
+            'temperatureStatusData': {'outdoorTemperature': content(2731 + rnd.randint(-100, 350))},
+            'vehicleParkingClockStatusData': {'vehicleParkingClock': content(timestamp)}}}}
+
+
+def trips(trip_type: str, count: int, seed: int = 0):
+    """
+    Builds a tripDataList response with the given number of trips, trip IDs are 1 to count
+    """
+    rnd = random.Random(seed)
+    mileage = rnd.randint(1000, 200000)
+    entries = []
+    for trip_id in range(1, count + 1):
+        distance = rnd.randint(1, 120)
+        entries.append({'tripType': trip_type, 'tripID': trip_id, 'mileage': distance, 'startMileage': mileage,
+                        'overallMileage': mileage + distance, 'traveltime': distance + rnd.randint(0, 60),
+                        'averageSpeed': rnd.randint(20, 120), 'averageFuelConsumption': rnd.randint(40, 120) / 10,
+                        'averageElectricEngineConsumption': None, 'reportReason': 'clamp15off',
+                        'timestamp': _TIMESTAMP.format(day=min(28, 1 + trip_id // 24), hour=trip_id % 24,
+                                                       minute=rnd.randint(0, 59))})
+        mileage += distance
+    return {'tripDataList': {'tripData': entries}}
+
+
+def clima_action(action_id: int, state: str):
+    return {'action': {'actionId': action_id, 'actionState': state, 'type': 'startClimatisation'}}
+
+
+def token():
+    return {'access_token': 'benchmark-token', 'token_type': 'bearer', 'expires_in': 3600}
+
+
+def gateway_error(code: str = 'gw.error.internal', description: str = 'Service unavailable'):
+    return {'error': {'errorCode': code, 'description': description}}
@@ -0,0 +1,33 @@
+"""
+Compares requests/sec of one-off requests against the pooled API session.
+
+Usage: python -m benchmark.PoolingBenchmark [requests]
+"""
+import sys
+import time
+
+import requests
+
+from audiapi.API import API
+from benchmark.MockServer import MockServer
+
+
+def run(name: str, count: int, call):
+    start = time.perf_counter()
+    for _ in range(count):
+        call()
+    elapsed = time.perf_counter() - start
+    print('{:<12} {:>8} requests {:>8.2f}s {:>10.1f} req/s'.format(name, count, elapsed, count / elapsed))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with MockServer({'status': 'ok'}) as server:
+        url = server.url + '/fs-car/bs/vsr/v1/Audi/DE/vehicles/VIN/status'
+        run('unpooled', count, lambda: requests.get(url, headers=API.BASE_HEADERS).json())
+        with API() as api:
+            run('pooled', count, lambda: api.get(url))
+
+
+if __name__ == '__main__':
+    main()
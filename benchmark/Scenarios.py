@@ -0,0 +1,149 @@
+"""
+Runs the API/Services stack against a local mock of msg.audi.de and reports
+throughput, latency percentiles and memory of typical workloads.
+
+Usage: python -m benchmark.Scenarios [single|fleet|jobs ...] [--latency ms] [--error-rate share]
+                                     [--vehicles count] [--retry] [--no-memory]
+
+Throughput and latency are measured in a first run, memory (peak of the Python
+allocations traced by tracemalloc) in a second run, since tracing slows everything down.
+"""
+import argparse
+import threading
+import time
+import tracemalloc
+
+from audiapi.API import API
+from audiapi.Exceptions import AudiAPIError
+from audiapi.Fleet import Fleet, FleetOperation
+from audiapi.Instrumentation import Instrumentation
+from audiapi.JobPoller import JobPoller
+from audiapi.Retry import RetryPolicy
+from audiapi.Services import Service, CarService, VehicleStatusReportService, RemoteBatteryChargeService, \
+    PreTripClimaService
+from audiapi.model.Vehicle import Vehicle
+from benchmark import Payloads
+from benchmark.MockServer import MockServerProcess
+
+
+class LatencyCollector(Instrumentation):
+    """
+    Keeps the total time of every request for exact percentiles
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.__lock = threading.Lock()
+
+    def record(self, metrics):
+        with self.__lock:
+            self.latencies.append(metrics.total)
+            if metrics.error is not None:
+                self.errors += 1
+
+    def percentile(self, q: float):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def single_car(api: API, options):
+    """
+    Polls status, charger and climater of one car sequentially
+    """
+    vehicle = Vehicle()
+    vehicle.vin = Payloads.vin(0)
+    status = VehicleStatusReportService(api, vehicle)
+    battery = RemoteBatteryChargeService(api, vehicle)
+    clima = PreTripClimaService(api, vehicle)
+    for _ in range(options.requests // 3):
+        for request in (status.get_stored_vehicle_data, battery.get_status, clima.get_status):
+            try:
+                request()
+            except AudiAPIError:
+                pass
+
+
+def fleet(api: API, options):
+    """
+    Lists all cars and fetches their stored vehicle data in parallel
+    """
+    vehicles = CarService(api).get_vehicles()
+    with Fleet(api, max_workers=options.workers) as runner:
+        for _ in runner.run(vehicles, FleetOperation.stored_vehicle_data):
+            pass
+
+
+def jobs(api: API, options):
+    """
+    Requests current vehicle data for every car and polls the jobs until they are done
+    """
+    vehicles = CarService(api).get_vehicles().vehicles[:options.jobs]
+    with JobPoller(api, max_workers=options.workers, initial_delay=0.01, max_delay=0.1, jitter=0.2) as poller:
+        futures = [poller.current_vehicle_data(vehicle) for vehicle in vehicles]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+
+SCENARIOS = {'single': single_car, 'fleet': fleet, 'jobs': jobs}
+
+
+def run(name: str, options, trace: bool):
+    collector = LatencyCollector()
+    with MockServerProcess(vehicle_count=options.vehicles, job_polls=2, latency=options.latency / 1000.0,
+                           error_rate=options.error_rate) as server:
+        Service.BASE_URL = server.url
+        retry = None
+        if options.retry:
+            retry = RetryPolicy(backoff=0.01, failure_threshold=1000)
+        with API(pool_maxsize=options.workers, instrumentation=collector, retry=retry) as api:
+            if trace:
+                tracemalloc.start()
+            start = time.perf_counter()
+            SCENARIOS[name](api, options)
+            elapsed = time.perf_counter() - start
+            peak = 0
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+    return collector, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the API against a local mock backend')
+    parser.add_argument('scenarios', nargs='*', help='Scenarios to run: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--latency', type=float, default=0.0, help='Latency of the mock backend in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of replies which are errors')
+    parser.add_argument('--vehicles', type=int, default=1000, help='Number of vehicles of the fleet')
+    parser.add_argument('--jobs', type=int, default=200, help='Number of vehicle data jobs')
+    parser.add_argument('--requests', type=int, default=3000, help='Number of requests of the single car')
+    parser.add_argument('--workers', type=int, default=32, help='Number of parallel workers')
+    parser.add_argument('--retry', action='store_true', help='Retry failed GET requests')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the memory measurement')
+    options = parser.parse_args()
+    for name in options.scenarios:
+        if name not in SCENARIOS:
+            parser.error('Unknown scenario: ' + name)
+    if not options.scenarios:
+        options.scenarios = list(SCENARIOS)
+
+    print('{:<8} {:>8} {:>7} {:>8} {:>10} {:>9} {:>9} {:>10}'.format(
+        'scenario', 'requests', 'errors', 'seconds', 'req/s', 'p50 ms', 'p99 ms', 'peak MiB'))
+    for name in options.scenarios:
+        collector, elapsed, _ = run(name, options, trace=False)
+        peak = 0
+        if not options.no_memory:
+            peak = run(name, options, trace=True)[2]
+        count = len(collector.latencies)
+        print('{:<8} {:>8} {:>7} {:>8.2f} {:>10.1f} {:>9.2f} {:>9.2f} {:>10.1f}'.format(
+            name, count, collector.errors, elapsed, count / elapsed, collector.percentile(0.5) * 1000,
+            collector.percentile(0.99) * 1000, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
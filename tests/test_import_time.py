@@ -0,0 +1,43 @@
+"""
+Regression test for the import time: importing the package must not pull in the HTTP clients,
+the optional JSON backends, NumPy or the models. See benchmark/ImportTime.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('requests', 'urllib3', 'aiohttp', 'numpy', 'msgspec', 'orjson', 'ujson')
+
+
+def imported_modules(statement: str):
+    """
+    Runs the statement in a fresh interpreter
+
+    :return: Names of all modules which are imported afterwards
+    :rtype: set[str]
+    """
+    process = subprocess.run([sys.executable, '-c', statement + '; import sys; print(" ".join(sys.modules))'],
+                             cwd=ROOT, stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    return set(process.stdout.split())
+
+
+def test_import_package_is_lazy():
+    modules = imported_modules('import audiapi')
+    assert not modules.intersection(HEAVY)
+    assert not [name for name in modules if name.startswith('audiapi.')]
+
+
+def test_lazy_attribute_only_imports_its_module():
+    modules = imported_modules('import audiapi; audiapi.RetryPolicy')
+    assert 'audiapi.Retry' in modules
+    assert not modules.intersection(HEAVY)
+    assert not [name for name in modules if name.startswith('audiapi.model')]
+
+
+def test_import_time_benchmark():
+    # Checks the modules listed in benchmark.ImportTime.CHECKS, exits with 1 on heavy imports
+    process = subprocess.run([sys.executable, '-m', 'benchmark.ImportTime', '--runs', '1'], cwd=ROOT,
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    assert process.returncode == 0, process.stdout